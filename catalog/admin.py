@@ -1,33 +1,177 @@
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Prefetch
+from django.forms import ModelChoiceField
+from django.forms.models import BaseInlineFormSet
 
 # Register your models here.
 
-from .models import Author, Genre, Book, BookInstance
+from .models import Author, Genre, Book, BookInstance, Language
+from .paginators import EstimatedCountPaginator
 
 # admin.site.register(Book)
 # admin.site.register(Author)
-admin.site.register(Genre)
 # admin.site.register(BookInstance)
 
-# Register the Admin classes for Book using the decorator
 
+class CatalogAdmin(admin.ModelAdmin):
+    """
+    Listados sin ``COUNT(*)`` extra del total sin filtrar y con el total
+    estimado en tablas grandes (ver ``catalog/paginators.py``).
+    """
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+# Búsquedas por prefijo (``^``): las que sirven los índices de la migración
+# 0013 para los autocompletados
+
+
+@admin.register(Genre)
+class GenreAdmin(CatalogAdmin):
+    search_fields = ('^name',)
+
+
+@admin.register(Language)
+class LanguageAdmin(CatalogAdmin):
+    search_fields = ('^name',)
+
+
+class InlineAutocompleteSelect(AutocompleteSelect):
+    """
+    ``AutocompleteSelect`` que toma la opción elegida de ``selected`` (el
+    objeto ya cargado con la fila) en lugar de consultarla.
+    """
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        values = [str(v) for v in value if v not in ('', None)]
+        if self.selected is None or values != list(self.selected):
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        for pk, label in self.selected.items():
+            options.append(self.create_option(name, pk, label, True,
+                                              len(options)))
+        return [(None, options, 0)]
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Formset de una sola página de ``per_page`` objetos relacionados."""
+    per_page = 20
+    page_number = 1
+
+    def get_queryset(self):
+        if not hasattr(self, 'page'):
+            paginator = Paginator(super().get_queryset(), self.per_page)
+            self.page = paginator.get_page(self.page_number)
+            self._queryset = self.page.object_list
+        return self._queryset
+
+    def _existing_object(self, pk):
+        if self.is_bound and not hasattr(self, '_object_dict'):
+            self._object_dict = {o.pk: o for o in self.get_queryset()}
+            # Filas enviadas que han cambiado de página desde el GET: se
+            # buscan entre todas las del padre, no solo en esta página
+            missing = set(self._submitted_pks()) - self._object_dict.keys()
+            if missing:
+                moved = self.queryset.filter(pk__in=missing)
+                self._object_dict.update((o.pk, o) for o in moved)
+        return super()._existing_object(pk)
+
+    def _submitted_pks(self):
+        pk_field = self.model._meta.pk
+        to_python = self._get_to_python(pk_field)
+        for i in range(self.initial_form_count()):
+            value = self.data.get(f'{self.add_prefix(i)}-{pk_field.name}')
+            try:
+                pk = to_python(value)
+            except ValidationError:
+                continue
+            if pk is not None:
+                yield pk
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        # El padre ya cargado: str() de cada fila no vuelve a pedirlo
+        setattr(form.instance, self.fk.name, self.instance)
+        for name, field in form.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, InlineAutocompleteSelect):
+                related = getattr(form.instance, name)
+                widget.selected = {} if related is None else {
+                    str(related.pk): field.label_from_instance(related)}
+        return form
+
+
+class PaginatedInline(admin.TabularInline):
+    """
+    Inline paginado (``?<prefijo>-page=N``), para objetos con miles de
+    filas relacionadas. Las opciones de las claves foráneas se consultan
+    una vez por petición y no una por fila; las de ``autocomplete_fields``
+    salen del JOIN de la consulta del inline.
+    """
+    formset = PaginatedInlineFormSet
+    template = 'admin/catalog/paginated_tabular.html'
+    per_page = 20
+    extra = 0
 
-class BooksInstanceInline(admin.TabularInline):
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        param = f'{formset.get_default_prefix()}-page'
+        return type(formset.__name__, (formset,), {
+            'per_page': self.per_page,
+            'page_number': request.GET.get(param, 1),
+            'page_param': param,
+        })
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        return qs.select_related(*self.autocomplete_fields)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs['widget'] = InlineAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_dbfield(db_field, request, **kwargs)
+        if (isinstance(formfield, ModelChoiceField)
+                and db_field.name not in self.autocomplete_fields):
+            # Copiadas a cada formulario del formset sin volver a la BD
+            formfield.choices = list(formfield.choices)
+        return formfield
+
+
+class BooksInstanceInline(PaginatedInline):
     model = BookInstance
     extra = 0
+    fields = ('imprint', 'status', 'due_back', 'borrower')
+    autocomplete_fields = ('borrower',)
+    ordering = ('due_back', 'id')
 
 
 # o admin.StackedInline para un formato diferente
-class BooksInline(admin.TabularInline):
+class BooksInline(PaginatedInline):
     model = Book
     extra = 0
+    # Géneros y resumen se editan en la ficha del libro
+    fields = ('title', 'isbn', 'language')
+    autocomplete_fields = ('language',)
+    ordering = ('title', 'id')
+    show_change_link = True
 
 
 # Define the admin class
-class AuthorAdmin(admin.ModelAdmin):
+class AuthorAdmin(CatalogAdmin):
     t = ('last_name', 'first_name', 'date_of_birth', 'date_of_death')
     list_display = t
     fields = ['first_name', 'last_name', ('date_of_birth', 'date_of_death')]
+    search_fields = ('^last_name', '^first_name')
     inlines = [BooksInline]
 
 
@@ -36,15 +180,24 @@ admin.site.register(Author, AuthorAdmin)
 
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
+class BookAdmin(CatalogAdmin):
     list_display = ('title', 'author', 'display_genre')
+    list_select_related = ('author',)
+    search_fields = ('^title',)
+    autocomplete_fields = ('author', 'genre', 'language')
     inlines = [BooksInstanceInline]
 
+    def get_queryset(self, request):
+        # Los géneros de la página en una consulta (ver Book.display_genre)
+        genres = Prefetch('genre', queryset=Genre.objects.only('name'))
+        qs = super().get_queryset(request)
+        return qs.prefetch_related(genres)
+
 # Register the Admin classes for BookInstance using the decorator
 
 
 @admin.register(BookInstance)
-class BookInstanceAdmin(admin.ModelAdmin):
+class BookInstanceAdmin(CatalogAdmin):
     list_filter = ('status', 'due_back')
     fieldsets = (
         (None, {
@@ -55,4 +208,6 @@ class BookInstanceAdmin(admin.ModelAdmin):
         }),
     )
     list_display = ('book', 'status', 'borrower', 'due_back', 'id')
+    list_select_related = ('book', 'borrower')
+    autocomplete_fields = ('book', 'borrower')
     readonly_fields = ('id',)
@@ -0,0 +1,280 @@
+"""
+API JSON de solo lectura del catálogo (más el alta de autores).
+
+Rutas (ver ``catalog/urls.py``): ``api/<recurso>/`` y
+``api/<recurso>/<pk>``, con los recursos de ``RESOURCES``. Parámetros de
+los listados:
+
+- ``fields=a,b``: solo esos campos (y solo esas columnas en el SELECT).
+- ``ids=1,2,3``: los objetos con esos ``pk`` (como mucho ``MAX_LIMIT``).
+- ``limit`` y ``cursor``: paginación por cursor sobre ``pk``; la respuesta
+  trae el enlace ``next``.
+- ``stream=1``: todos los resultados, serializados por lotes de
+  ``STREAM_CHUNK`` en un ``StreamingHttpResponse``.
+- Filtros propios de cada recurso (``FILTERS``).
+
+Cada petición cuesta una consulta más una por relación muchos a muchos
+pedida (y, con ``stream``, eso mismo por lote), sea cual sea el número de
+resultados.
+"""
+
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.forms import modelform_factory
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_http_methods
+
+from .loader import chunked
+from .models import Author, Book, BookInstance, Genre, Language
+from .paginators import KeysetPaginator, InvalidCursor
+from .routers import reads_from_replica
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+STREAM_CHUNK = 1000
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Resource:
+    """
+    Recurso de la API sobre ``model``.
+
+    ``FIELDS`` asocia cada campo de la API a un atributo del modelo,
+    ``RELATED`` los campos muchos a muchos (nombre del campo del modelo),
+    ``FILTERS`` los parámetros de filtro a su lookup y ``PERMISSIONS`` los
+    campos que requieren un permiso.
+    """
+    model = None
+    FIELDS = {}
+    RELATED = {}
+    FILTERS = {}
+    PERMISSIONS = {}
+    form_fields = None  # Campos del alta por POST; None = sin alta
+
+    def __init__(self, request):
+        self.request = request
+        user = request.user
+        self.available = [
+            name for name in (*self.FIELDS, *self.RELATED)
+            if name not in self.PERMISSIONS
+            or user.has_perm(self.PERMISSIONS[name])
+        ]
+
+    def parse_fields(self):
+        param = self.request.GET.get('fields')
+        if not param:
+            return self.available
+        fields = [f for f in param.split(',') if f]
+        unknown = set(fields) - set(self.available)
+        if unknown:
+            raise ApiError(f'Unknown fields: {", ".join(sorted(unknown))}')
+        return fields
+
+    def pks(self, values):
+        pk = self.model._meta.pk
+        try:
+            return [pk.to_python(v) for v in values if v]
+        except ValidationError:
+            raise ApiError('Invalid ids')
+
+    def queryset(self, fields):
+        columns = [self.FIELDS[f] for f in fields if f in self.FIELDS]
+        qs = self.model.objects.only(*dict.fromkeys(['pk', *columns]))
+        ids = self.request.GET.get('ids')
+        if ids is not None:
+            pks = self.pks(ids.split(','))
+            if len(pks) > MAX_LIMIT:
+                raise ApiError(f'At most {MAX_LIMIT} ids')
+            qs = qs.filter(pk__in=pks)
+        for param, lookup in self.FILTERS.items():
+            if param in self.request.GET:
+                field = self.model._meta.get_field(lookup)
+                try:
+                    value = field.to_python(self.request.GET[param])
+                except ValidationError:
+                    raise ApiError(f'Invalid {param}')
+                qs = qs.filter(**{lookup: value})
+        return qs
+
+    def dump(self, objs, fields):
+        """Serializa ``objs`` con una consulta por relación pedida."""
+        related = {}
+        pks = [obj.pk for obj in objs]
+        for name in fields:
+            if name in self.RELATED:
+                related[name] = self._related(self.RELATED[name], pks)
+        return [
+            {name: related[name].get(obj.pk, []) if name in related
+             else getattr(obj, self.FIELDS[name])
+             for name in fields}
+            for obj in objs
+        ]
+
+    def _related(self, field_name, pks):
+        field = self.model._meta.get_field(field_name)
+        through = field.remote_field.through
+        source = field.m2m_column_name()
+        target = field.m2m_reverse_name()
+        result = {}
+        rows = through.objects.filter(**{f'{source}__in': pks}).order_by(
+            source, target).values_list(source, target)
+        for pk, related_pk in rows:
+            result.setdefault(pk, []).append(related_pk)
+        return result
+
+
+class BookResource(Resource):
+    model = Book
+    FIELDS = {
+        'id': 'pk', 'title': 'title', 'summary': 'summary', 'isbn': 'isbn',
+        'author': 'author_id', 'language': 'language_id',
+        'copies_total': 'copies_total',
+        'copies_available': 'copies_available',
+        'copies_on_loan': 'copies_on_loan',
+        'copies_reserved': 'copies_reserved',
+        'copies_maintenance': 'copies_maintenance',
+    }
+    RELATED = {'genres': 'genre'}
+    FILTERS = {'author': 'author_id', 'language': 'language_id'}
+
+
+class AuthorResource(Resource):
+    model = Author
+    FIELDS = {
+        'id': 'pk', 'first_name': 'first_name', 'last_name': 'last_name',
+        'date_of_birth': 'date_of_birth', 'date_of_death': 'date_of_death',
+    }
+    form_fields = ['first_name', 'last_name', 'date_of_birth',
+                   'date_of_death']
+
+
+class CopyResource(Resource):
+    model = BookInstance
+    FIELDS = {
+        'id': 'pk', 'book': 'book_id', 'imprint': 'imprint',
+        'status': 'status', 'due_back': 'due_back',
+        'borrower': 'borrower_id',
+    }
+    FILTERS = {'book': 'book_id', 'status': 'status'}
+    PERMISSIONS = {'borrower': 'catalog.can_mark_returned'}
+
+
+class GenreResource(Resource):
+    model = Genre
+    FIELDS = {'id': 'pk', 'name': 'name'}
+
+
+class LanguageResource(Resource):
+    model = Language
+    FIELDS = {'id': 'pk', 'name': 'name'}
+
+
+RESOURCES = {
+    'books': BookResource,
+    'authors': AuthorResource,
+    'copies': CopyResource,
+    'genres': GenreResource,
+    'languages': LanguageResource,
+}
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, encoder=DjangoJSONEncoder)
+
+
+def _stream(resource, qs, fields):
+    encoder = DjangoJSONEncoder()
+    yield '['
+    first = True
+    for chunk in chunked(qs.iterator(chunk_size=STREAM_CHUNK), STREAM_CHUNK):
+        for item in resource.dump(chunk, fields):
+            yield ('' if first else ',') + encoder.encode(item)
+            first = False
+    yield ']'
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError('Invalid limit')
+    if not 0 < limit <= MAX_LIMIT:
+        raise ApiError(f'limit must be between 1 and {MAX_LIMIT}')
+    return limit
+
+
+def _list(request, resource):
+    fields = resource.parse_fields()
+    qs = resource.queryset(fields).order_by('pk')
+    if request.GET.get('stream') in ('1', 'true'):
+        return StreamingHttpResponse(_stream(resource, qs, fields),
+                                     content_type='application/json')
+    paginator = KeysetPaginator(qs, _limit(request), ordering=['pk'])
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        raise ApiError('Invalid cursor')
+    next_url = None
+    if page.has_next():
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_url = request.build_absolute_uri(
+            f'{request.path}?{params.urlencode()}')
+    return _json({'results': resource.dump(page.object_list, fields),
+                  'next': next_url})
+
+
+def _create(request, resource):
+    if resource.form_fields is None:
+        raise ApiError('Method not allowed', 405)
+    opts = resource.model._meta
+    if not request.user.has_perm(f'{opts.app_label}.add_{opts.model_name}'):
+        raise ApiError('Permission denied', 403)
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        raise ApiError('Invalid JSON')
+    if not isinstance(data, dict):
+        # Los formularios esperan un objeto de campos
+        raise ApiError('Invalid JSON')
+    form = modelform_factory(resource.model, fields=resource.form_fields)(
+        data=data)
+    if not form.is_valid():
+        return _json({'errors': form.errors}, status=400)
+    obj = form.save()
+    return _json(resource.dump([obj], resource.available)[0], status=201)
+
+
+@reads_from_replica
+@require_http_methods(['GET', 'HEAD', 'POST'])
+def resource_list(request, resource):
+    resource = RESOURCES[resource](request)
+    try:
+        if request.method == 'POST':
+            return _create(request, resource)
+        return _list(request, resource)
+    except ApiError as e:
+        return _json({'error': str(e)}, status=e.status)
+
+
+@reads_from_replica
+@require_http_methods(['GET', 'HEAD'])
+def resource_detail(request, resource, pk):
+    resource = RESOURCES[resource](request)
+    try:
+        fields = resource.parse_fields()
+        pks = resource.pks([pk])
+        obj = resource.queryset(fields).filter(pk__in=pks).first()
+    except ApiError as e:
+        return _json({'error': str(e)}, status=e.status)
+    if obj is None:
+        return _json({'error': 'Not found'}, status=404)
+    return _json(resource.dump([obj], fields)[0])
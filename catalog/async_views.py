@@ -0,0 +1,139 @@
+"""
+Versiones asíncronas de las vistas de solo lectura del catálogo.
+
+Comparten consultas, plantillas y paginación con las de ``views.py``, pero
+acceden a la BD con la API asíncrona del ORM (``acount``, ``aget``,
+iteración asíncrona), de modo que bajo ASGI un mismo proceso atiende otras
+peticiones mientras espera a la BD. Se enrutan en lugar de las síncronas
+con ``CATALOG_ASYNC_VIEWS`` (ver ``catalog/urls.py``).
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.http import Http404
+from django.template.response import TemplateResponse
+
+from . import views
+from .paginators import KeysetPaginator, InvalidCursor
+from .routers import reads_from_replica
+from .stats import aget_stats
+from .visits import count_visit
+
+
+@reads_from_replica
+async def index(request):
+    """View function for home page of site."""
+    # La sesión solo tiene API síncrona
+    num_visits = await sync_to_async(count_visit)(request.session)
+
+    context = {
+        **await aget_stats(),
+        'num_visits': num_visits,
+    }
+
+    return TemplateResponse(request, 'index.html', context=context)
+
+
+class AsyncMultipleObjectMixin:
+    """
+    ``get`` asíncrono para ``ListView``: pagina (por número de página o por
+    cursor) con consultas asíncronas antes de construir el contexto. Las
+    vistas incluyen ``ConditionalGetMixin``.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        response = await sync_to_async(self.conditional_response)(request)
+        if response is not None:
+            return response
+        self.object_list = self.get_queryset()
+        page_size = self.get_paginate_by(self.object_list)
+        if page_size:
+            self._paginated = await self.apaginate_queryset(
+                self.object_list, page_size)
+        else:
+            self.object_list = [obj async for obj in self.object_list]
+        context = self.get_context_data()
+        return self.add_validators(self.render_to_response(context))
+
+    def paginate_queryset(self, queryset, page_size):
+        # Ya resuelto en apaginate_queryset
+        return self._paginated
+
+    async def apaginate_queryset(self, queryset, page_size):
+        cursor_kwarg = getattr(self, 'cursor_kwarg', None)
+        if cursor_kwarg in self.request.GET:
+            paginator = KeysetPaginator(
+                queryset, page_size, self.keyset_ordering)
+            try:
+                page = await paginator.apage(self.request.GET[cursor_kwarg])
+            except InvalidCursor:
+                raise Http404('Invalid cursor')
+            return (paginator, page, page.object_list,
+                    page.has_other_pages())
+
+        paginator = self.get_paginator(
+            queryset, page_size, orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty())
+        if hasattr(paginator, 'acount'):
+            await paginator.acount()
+        else:
+            paginator.count = await queryset.acount()
+        page_kwarg = self.page_kwarg
+        page = (self.kwargs.get(page_kwarg)
+                or self.request.GET.get(page_kwarg) or 1)
+        try:
+            number = paginator.validate_number(
+                paginator.num_pages if page == 'last' else page)
+        except InvalidPage as e:
+            raise Http404(f'Invalid page ({page}): {e}')
+        if hasattr(paginator, 'apage'):
+            try:
+                page = await paginator.apage(number)
+            except InvalidPage as e:
+                raise Http404(f'Invalid page ({number}): {e}')
+            return (paginator, page, page.object_list,
+                    page.has_other_pages())
+        bottom = (number - 1) * paginator.per_page
+        top = bottom + paginator.per_page
+        if top + paginator.orphans >= paginator.count:
+            top = paginator.count
+        objects = [obj async for obj in queryset[bottom:top]]
+        page = paginator._get_page(objects, number, paginator)
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class AsyncSingleObjectMixin:
+    """``get`` asíncrono para ``DetailView`` (por ``pk``)."""
+
+    async def get(self, request, *args, **kwargs):
+        response = await sync_to_async(self.conditional_response)(request)
+        if response is not None:
+            return response
+        self.object = await self.aget_object()
+        context = self.get_context_data(object=self.object)
+        return self.add_validators(self.render_to_response(context))
+
+    async def aget_object(self):
+        queryset = self.get_queryset()
+        pk = self.kwargs.get(self.pk_url_kwarg)
+        try:
+            return await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            name = queryset.model._meta.verbose_name
+            raise Http404(f'No {name} found matching the query')
+
+
+class BookListView(AsyncMultipleObjectMixin, views.BookListView):
+    pass
+
+
+class BookDetailView(AsyncSingleObjectMixin, views.BookDetailView):
+    pass
+
+
+class AuthorListView(AsyncMultipleObjectMixin, views.AuthorListView):
+    pass
+
+
+class AuthorDetailView(AsyncSingleObjectMixin, views.AuthorDetailView):
+    pass
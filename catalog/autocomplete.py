@@ -0,0 +1,77 @@
+"""
+Autocompletado de claves foráneas para los formularios del catálogo.
+
+``autocomplete/<fuente>/?q=<texto>&page=<n>`` devuelve en el formato de
+Select2 (``results`` con ``id`` y ``text``, y ``pagination.more``) los
+objetos cuyos campos de búsqueda empiezan por ``q``, de ``PAGE_SIZE`` en
+``PAGE_SIZE`` y sin ``COUNT(*)``. La búsqueda por prefijo sin distinguir
+mayúsculas usa en PostgreSQL los índices ``UPPER(col) text_pattern_ops``
+de la migración 0013. Los widgets están en ``catalog/widgets.py``.
+"""
+
+from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+
+from .models import Author, Book, Genre, Language
+from .routers import reads_from_replica
+
+
+PAGE_SIZE = 20
+
+
+class Source:
+    """Modelo, campos de búsqueda (y orden) y permiso necesario."""
+
+    def __init__(self, model, search_fields, permission=None):
+        self.model = model
+        self.search_fields = search_fields
+        self.permission = permission
+
+    def has_permission(self, user):
+        if self.permission is None:
+            return True
+        return user.is_staff or user.has_perm(self.permission)
+
+    def queryset(self, q):
+        qs = self.model.objects.only('pk', *self.search_fields)
+        if q:
+            match = Q()
+            for field in self.search_fields:
+                match |= Q(**{f'{field}__istartswith': q})
+            qs = qs.filter(match)
+        return qs.order_by(*self.search_fields, 'pk')
+
+
+SOURCES = {
+    'authors': Source(Author, ('last_name', 'first_name')),
+    'books': Source(Book, ('title',)),
+    'genres': Source(Genre, ('name',)),
+    'languages': Source(Language, ('name',)),
+    # Los prestatarios solo para quien gestiona préstamos
+    'users': Source(User, ('username',), 'catalog.can_mark_returned'),
+}
+
+
+@reads_from_replica
+@require_GET
+def autocomplete(request, source):
+    if source not in SOURCES:
+        raise Http404('Unknown source')
+    source = SOURCES[source]
+    if not source.has_permission(request.user):
+        raise PermissionDenied
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    start = (page - 1) * PAGE_SIZE
+    q = request.GET.get('q', '').strip()
+    objs = list(source.queryset(q)[start:start + PAGE_SIZE + 1])
+    return JsonResponse({
+        'results': [{'id': obj.pk, 'text': str(obj)}
+                    for obj in objs[:PAGE_SIZE]],
+        'pagination': {'more': len(objs) > PAGE_SIZE},
+    })
@@ -0,0 +1,81 @@
+"""
+Backend de autenticación con los permisos cacheados entre peticiones.
+
+``ModelBackend`` solo cachea los permisos en el objeto usuario, así que
+cada petición de un usuario del staff vuelve a consultarlos. Aquí el
+conjunto de permisos se guarda en la caché de Django por usuario y sesión
+(``last_login``), bajo una "generación" que cambia cuando se modifican
+usuarios, grupos o permisos.
+
+La generación solo se ve en todos los procesos si la caché ``default`` es
+compartida (Redis, Memcached, base de datos, ficheros). Con ``LocMemCache``
+cada worker tiene la suya y una revocación solo invalida la del proceso
+que la atendió, así que ahí los permisos solo se reutilizan
+``PERMS_LOCAL_TIMEOUT`` segundos.
+"""
+
+import time
+
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+PERMS_GENERATION_KEY = 'catalog:perms:generation'
+PERMS_TIMEOUT = 60 * 60
+PERMS_LOCAL_TIMEOUT = 5
+
+
+def perms_timeout():
+    if isinstance(caches['default'], LocMemCache):
+        return PERMS_LOCAL_TIMEOUT
+    return PERMS_TIMEOUT
+
+
+def _generation():
+    generation = cache.get(PERMS_GENERATION_KEY)
+    if generation is None:
+        generation = time.time_ns()
+        cache.set(PERMS_GENERATION_KEY, generation, None)
+    return generation
+
+
+def perms_cache_key(user):
+    login = user.last_login.timestamp() if user.last_login else 0
+    return f'catalog:perms:{_generation()}:{user.pk}:{login}'
+
+
+def invalidate_perms(**kwargs):
+    """Descarta los permisos cacheados de todos los usuarios."""
+    cache.set(PERMS_GENERATION_KEY, time.time_ns(), None)
+
+
+class CachedModelBackend(ModelBackend):
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            key = perms_cache_key(user_obj)
+            perms = cache.get(key)
+            if perms is None:
+                perms = super().get_all_permissions(user_obj)
+                cache.set(key, perms, perms_timeout())
+            user_obj._perm_cache = perms
+        return user_obj._perm_cache
+
+
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    """Receptor de ``post_save`` de ``User``."""
+    # El login solo actualiza last_login, que ya forma parte de la clave
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    invalidate_perms()
+
+
+def perms_m2m_changed(sender, action, **kwargs):
+    """
+    Receptor de ``m2m_changed`` de ``User.groups``,
+    ``User.user_permissions`` y ``Group.permissions``.
+    """
+    if action.startswith('post_'):
+        invalidate_perms()
@@ -0,0 +1,176 @@
+"""
+GET condicional (ETag / Last-Modified) para las páginas de libros y autores.
+
+Los validadores de las fichas salen de una única consulta agregada sobre
+``updated_at`` (y el número de filas, para notar los borrados); si el
+cliente ya tiene la versión actual se responde 304 sin cargar el resto ni
+renderizar nada. Los géneros y los idiomas no tienen fecha propia: al
+cambiarlos se actualiza la de sus libros. Los listados no consultan la BD:
+usan las generaciones de las etiquetas ``books`` y ``authors`` de la caché
+de páginas (``catalog/pagecache.py``), que cambian las mismas señales que
+invalidan esas páginas.
+
+El ETag cubre también lo que depende del usuario (permisos y, para el
+staff, los préstamos vencidos de la barra lateral). ``Last-Modified`` solo
+se envía cuando la fecha basta para notar cualquier cambio: en la ficha de
+un libro (borrar una copia recalcula los contadores del libro y mueve su
+``updated_at``) y para usuarios anónimos. En los listados y en la ficha de
+un autor un borrado no mueve ninguna fecha, y con ``If-Modified-Since``
+esas páginas se servirían viejas.
+"""
+
+import hashlib
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .models import Author, Book
+from .overdue import get_overdue_count
+from .pagecache import page_cache, tag_generations
+
+
+# Con LocMem las generaciones son de cada proceso y no ven las
+# invalidaciones de los demás: ahí el ETag de un listado dura como mucho
+# estos segundos
+LIST_LOCAL_TIMEOUT = 5
+
+
+def _latest(*times):
+    times = [t for t in times if t is not None]
+    return max(times) if times else None
+
+
+def book_validators(pk):
+    """El libro, su autor y sus copias."""
+    row = (Book.objects.filter(pk=pk)
+           .values('updated_at', 'author__updated_at')
+           .annotate(copies=Count('bookinstance'),
+                     copies_updated=Max('bookinstance__updated_at'))
+           .order_by('pk').first())
+    if row is None:
+        return None
+    times = (row['updated_at'], row['author__updated_at'],
+             row['copies_updated'])
+    return (pk, row['copies'], *times), _latest(*times)
+
+
+def _list_validators(*tags):
+    parts = tag_generations(tags)
+    if isinstance(page_cache(), LocMemCache):
+        parts.append(int(time.time() // LIST_LOCAL_TIMEOUT))
+    return parts, None
+
+
+def book_list_validators():
+    """Los libros y los nombres de sus autores."""
+    return _list_validators('books', 'authors')
+
+
+def author_validators(pk):
+    """El autor y sus libros."""
+    row = (Author.objects.filter(pk=pk)
+           .values('updated_at')
+           .annotate(books=Count('book'),
+                     books_updated=Max('book__updated_at'))
+           .order_by('pk').first())
+    if row is None:
+        return None
+    return (pk, row['books'], row['updated_at'], row['books_updated']), None
+
+
+def author_list_validators():
+    return _list_validators('authors')
+
+
+def user_validators(user):
+    """Lo que la página pinta según el usuario."""
+    if not user.is_authenticated:
+        return (0,)
+    parts = [user.pk, user.get_username(), user.is_staff,
+             *sorted(user.get_all_permissions())]
+    if user.is_staff:
+        parts.append(get_overdue_count())
+    return parts
+
+
+class ConditionalGetMixin:
+    """
+    Responde a ``If-None-Match`` / ``If-Modified-Since`` con 304 antes de
+    ejecutar ``get``. Las subclases definen ``get_validators``.
+    """
+
+    def get_validators(self):
+        """``(partes del ETag, última modificación)``, o ``None``."""
+        raise NotImplementedError
+
+    def conditional_response(self, request):
+        """Respuesta 304/412 si el cliente está al día; si no, ``None``."""
+        self._etag = self._last_modified = None
+        validators = self.get_validators()
+        if validators is None:
+            return None
+        parts, last_modified = validators
+        parts = (*parts, *user_validators(request.user))
+        if request.user.is_authenticated:
+            # La fecha no refleja los cambios de permisos
+            last_modified = None
+        key = '|'.join(map(str, parts)).encode()
+        self._etag = quote_etag(hashlib.md5(key).hexdigest())
+        if last_modified is not None:
+            self._last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=self._etag, last_modified=self._last_modified)
+        if response is not None:
+            self.add_validators(response)
+        return response
+
+    def add_validators(self, response):
+        if self._etag:
+            response.headers.setdefault('ETag', self._etag)
+        if self._last_modified and not response.has_header('Last-Modified'):
+            response['Last-Modified'] = http_date(self._last_modified)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        response = self.conditional_response(request)
+        if response is not None:
+            return response
+        return self.add_validators(super().get(request, *args, **kwargs))
+
+
+def _touch_books(books):
+    books.update(updated_at=timezone.now())
+
+
+def genres_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Receptor de ``m2m_changed`` de ``Book.genre``: los géneros se pintan en
+    la ficha, así que cambian su ETag.
+    """
+    if action == 'pre_clear' and reverse:
+        # Después del clear() ya no se sabe qué libros tenía el género
+        _touch_books(Book.objects.filter(genre=instance))
+    if not action.startswith('post_'):
+        return
+    ids = pk_set if reverse else [instance.pk]
+    if ids:
+        _touch_books(Book.objects.filter(pk__in=ids))
+
+
+def genre_changed(sender, instance, created=False, **kwargs):
+    """
+    Receptor de ``post_save`` / ``pre_delete`` de ``Genre``: su nombre se
+    pinta en la ficha de sus libros.
+    """
+    if not created:
+        _touch_books(Book.objects.filter(genre=instance))
+
+
+def language_changed(sender, instance, created=False, **kwargs):
+    """Como ``genre_changed``, para ``Language``."""
+    if not created:
+        _touch_books(Book.objects.filter(language=instance))
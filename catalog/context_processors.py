@@ -0,0 +1,26 @@
+from django.conf import settings
+
+from .overdue import get_overdue_count
+
+
+SIDEBAR_PERMS = ('catalog.add_author', 'catalog.add_book')
+
+
+def sidebar(request):
+    """
+    Datos de la caché del fragmento de staff de la barra lateral: su
+    duración y lo que cambia su contenido, permisos y préstamos vencidos
+    (ver ``base_generic.html``). Es el mismo para todo el staff con los
+    mismos permisos, sea cual sea el usuario o la página.
+    """
+    context = {
+        'sidebar_timeout': getattr(settings, 'SIDEBAR_CACHE_TIMEOUT', 600),
+        'sidebar_perms': '',
+        'overdue_count': '',
+    }
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        perms = [p for p in SIDEBAR_PERMS if user.has_perm(p)]
+        context['sidebar_perms'] = ','.join(perms)
+        context['overdue_count'] = get_overdue_count()
+    return context
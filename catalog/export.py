@@ -0,0 +1,107 @@
+"""
+Exportación en streaming del catálogo (CSV o JSONL, opcionalmente gzip).
+
+Las filas se leen con ``iterator(chunk_size=...)`` (cursores del lado del
+servidor en PostgreSQL) como diccionarios de ``values()``, y se escriben
+según se generan: la memoria no depende del tamaño del catálogo. Los
+libros se exportan en el formato de registro de ``catalog.loader``, así
+que el fichero se puede volver a importar con ``import_catalog``.
+"""
+
+import csv
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .loader import chunked
+from .models import Book, BookInstance
+
+
+CHUNK_SIZE = 2000
+
+BOOK_COLUMNS = ('id', 'title', 'summary', 'isbn', 'author_first_name',
+                'author_last_name', 'language', 'genres', 'copies')
+COPY_COLUMNS = ('id', 'book_id', 'book_title', 'imprint', 'status',
+                'due_back', 'borrower')
+
+
+def book_rows():
+    qs = Book.objects.order_by('pk').values_list(
+        'pk', 'title', 'summary', 'isbn', 'author__first_name',
+        'author__last_name', 'language__name', 'copies_total')
+    through = Book.genre.through
+    for chunk in chunked(qs.iterator(chunk_size=CHUNK_SIZE), CHUNK_SIZE):
+        genres = {}
+        links = through.objects.filter(
+            book_id__in=[row[0] for row in chunk]).order_by(
+            'book_id', 'genre__name').values_list('book_id', 'genre__name')
+        for book_id, name in links:
+            genres.setdefault(book_id, []).append(name)
+        for pk, *values, copies in chunk:
+            yield dict(zip(BOOK_COLUMNS,
+                           (pk, *values, genres.get(pk, []), copies)))
+
+
+def copy_rows(on_loan=False):
+    qs = BookInstance.objects.values_list(
+        'pk', 'book_id', 'book__title', 'imprint', 'status', 'due_back',
+        'borrower__username')
+    if on_loan:
+        qs = qs.on_loan().order_by('due_back', 'pk')
+    else:
+        qs = qs.order_by('pk')
+    for row in qs.iterator(chunk_size=CHUNK_SIZE):
+        yield dict(zip(COPY_COLUMNS, row))
+
+
+DATASETS = {
+    'books': (BOOK_COLUMNS, book_rows),
+    'copies': (COPY_COLUMNS, copy_rows),
+    'loans': (COPY_COLUMNS, lambda: copy_rows(on_loan=True)),
+}
+
+
+class _Line:
+    """Destino de ``csv.writer`` que devuelve la línea escrita."""
+
+    def write(self, value):
+        return value
+
+
+def to_csv(columns, rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(columns)
+    for row in rows:
+        if isinstance(row.get('genres'), list):
+            row['genres'] = '|'.join(row['genres'])
+        yield writer.writerow([row[c] for c in columns])
+
+
+def to_jsonl(columns, rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+FORMATS = {'csv': to_csv, 'jsonl': to_jsonl}
+
+
+def gzipped(lines, size=64 * 1024):
+    """Comprime ``lines`` en bloques de unos ``size`` bytes."""
+    compressor = zlib.compressobj(wbits=31)  # Cabecera gzip
+    buffer, length = [], 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        length += len(data)
+        if length >= size:
+            yield compressor.compress(b''.join(buffer))
+            buffer, length = [], 0
+    yield compressor.compress(b''.join(buffer)) + compressor.flush()
+
+
+def export(dataset, fmt, gzip=False):
+    """Iterador con el contenido exportado de ``dataset`` en ``fmt``."""
+    columns, rows = DATASETS[dataset]
+    lines = FORMATS[fmt](columns, rows())
+    return gzipped(lines) if gzip else lines
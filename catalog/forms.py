@@ -1,9 +1,13 @@
 from django import forms
 
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 import datetime  # for checking renewal date range.
 
+from .models import Book, BookInstance
+from .widgets import AutocompleteSelect, AutocompleteSelectMultiple
+
 
 class RenewBookForm(forms.Form):
     t = "Enter a date between now and 4 weeks (default 3)."
@@ -23,3 +27,82 @@ class RenewBookForm(forms.Form):
 
         # Remember to always return the cleaned data.
         return data
+
+
+class BulkLoanForm(RenewBookForm):
+    """
+    Renovación o devolución de varias copias prestadas a la vez.
+
+    ``renewal_date`` sigue las reglas de ``RenewBookForm`` y solo hace
+    falta para renovar. ``row_errors`` asocia cada copia que no se puede
+    procesar a su error; si hay alguno no se modifica ninguna.
+    """
+    ACTIONS = (('renew', _('Renew')), ('return', _('Mark returned')))
+
+    action = forms.ChoiceField(choices=ACTIONS)
+    copies = forms.Field(widget=forms.MultipleHiddenInput)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['renewal_date'].required = False
+        self.row_errors = {}
+
+    def clean_copies(self):
+        pk = BookInstance._meta.pk
+        ids = []
+        for value in self.cleaned_data['copies']:
+            try:
+                ids.append(pk.to_python(value))
+            except ValidationError:
+                self.row_errors[value] = _('Unknown copy')
+        return ids
+
+    def clean_renewal_date(self):
+        if self.cleaned_data.get('renewal_date') is None:
+            return None
+        return super().clean_renewal_date()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if (cleaned_data.get('action') == 'renew'
+                and cleaned_data.get('renewal_date') is None
+                and 'renewal_date' not in self.errors):
+            self.add_error('renewal_date', _('Renewal date is required'))
+        return cleaned_data
+
+    def save(self):
+        """
+        Aplica la acción con un único ``UPDATE`` en una transacción.
+
+        Devuelve el número de copias modificadas, o ``None`` si alguna copia
+        tiene errores (ver ``row_errors``).
+        """
+        ids = self.cleaned_data['copies']
+        with transaction.atomic():
+            status = dict(BookInstance.objects.select_for_update().filter(
+                pk__in=ids).values_list('pk', 'status'))
+            for pk in ids:
+                if pk not in status:
+                    self.row_errors[str(pk)] = _('Unknown copy')
+                elif status[pk] != 'o':
+                    self.row_errors[str(pk)] = _('Not on loan')
+            if self.row_errors:
+                return None
+            copies = BookInstance.objects.filter(pk__in=ids, status='o')
+            if self.cleaned_data['action'] == 'renew':
+                return copies.update(
+                    due_back=self.cleaned_data['renewal_date'])
+            return copies.update(status='a', due_back=None, borrower=None)
+
+
+class BookForm(forms.ModelForm):
+    """Alta y edición de libros con autor, géneros e idioma autocompletados."""
+
+    class Meta:
+        model = Book
+        fields = ['title', 'author', 'summary', 'isbn', 'genre', 'language']
+        widgets = {
+            'author': AutocompleteSelect('authors'),
+            'genre': AutocompleteSelectMultiple('genres'),
+            'language': AutocompleteSelect('languages'),
+        }
@@ -0,0 +1,142 @@
+"""
+Generador determinista de datos sintéticos del catálogo.
+
+Con la misma semilla produce siempre los mismos autores, libros, géneros,
+idiomas, copias y prestatarios. Las distribuciones imitan una biblioteca
+real: pocos autores concentran muchos libros, pocos libros concentran
+muchas copias y el estado de las copias sigue ``LOAN_RATIOS``.
+"""
+
+import datetime as dt
+import random
+import uuid
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .loader import CatalogLoader, chunked
+from .models import BookInstance
+
+
+# Proporción de copias en cada estado de BookInstance.LOAN_STATUS
+LOAN_RATIOS = {'a': 0.55, 'o': 0.30, 'r': 0.10, 'm': 0.05}
+
+WORDS = (
+    'shadow night river empire robot garden winter machine silent city '
+    'stone dream star ocean fire glass forest storm iron secret memory '
+    'hotel island moon crown blood letter mirror road window time'
+).split()
+FIRST_NAMES = (
+    'Isaac Stephen Ursula Jorge Gabriel Ana Carmen Mary Philip Octavia '
+    'Arthur Agatha Frank Emilia Ray Margaret Julio Virginia Italo Toni'
+).split()
+LAST_NAMES = (
+    'Asimov King Le-Guin Borges Marquez Matute Laforet Shelley Dick Butler '
+    'Clarke Christie Herbert Pardo Bradbury Atwood Verne Woolf Calvino '
+    'Morrison'
+).split()
+GENRES = (
+    'Horror', 'Thriller', 'Science Fiction', 'Historical', 'Fantasy',
+    'Poetry', 'Romance', 'Mystery', 'Biography', 'Essay', 'Drama', 'Humor',
+)
+LANGUAGES = ('English', 'Spanish', 'French', 'German', 'Italian')
+
+
+class CatalogGenerator:
+    """
+    Genera ``books`` libros de ``authors`` autores con una media de
+    ``copies_per_book`` copias, y ``users`` prestatarios.
+    """
+
+    def __init__(self, seed=0, books=1000, authors=200, users=100,
+                 copies_per_book=3, batch_size=1000):
+        self.random = random.Random(seed)
+        # Secuencia aparte para las copias: no depende del tamaño de lote
+        self.copies_random = random.Random(f'{seed}-copies')
+        self.books = books
+        self.authors = authors
+        self.users = users
+        self.copies_per_book = copies_per_book
+        self.batch_size = batch_size
+        self.today = dt.date.today()
+
+    def _zipf_weights(self, n, s=1.1):
+        return [1 / (i + 1) ** s for i in range(n)]
+
+    def _author_names(self):
+        names = []
+        for i in range(self.authors):
+            first = self.random.choice(FIRST_NAMES)
+            last = self.random.choice(LAST_NAMES)
+            names.append((first, f'{last} {i}'))
+        return names
+
+    def _copies(self):
+        """Copias por libro con cola larga (Pareto) y media aproximada."""
+        alpha = 1 + 1 / max(self.copies_per_book - 1, 0.1)
+        return min(int(self.copies_random.paretovariate(alpha)), 500)
+
+    def book_records(self):
+        """Registros de libros en el formato de ``catalog.loader``."""
+        authors = self._author_names()
+        weights = self._zipf_weights(len(authors))
+        genre_weights = self._zipf_weights(len(GENRES))
+        lang_weights = self._zipf_weights(len(LANGUAGES), s=2)
+        for i in range(self.books):
+            first, last = self.random.choices(authors, weights)[0]
+            words = self.random.sample(WORDS, 3)
+            k = self.random.choice((1, 1, 1, 2, 2, 3))
+            yield {
+                'title': f'The {words[0]} {words[1]} {i}'.title(),
+                'summary': ' '.join(self.random.choices(WORDS, k=40)),
+                'isbn': f'978{self.random.randrange(10 ** 10):010d}',
+                'author_first_name': first,
+                'author_last_name': last,
+                'language': self.random.choices(LANGUAGES, lang_weights)[0],
+                'genres': sorted(set(
+                    self.random.choices(GENRES, genre_weights, k=k))),
+            }
+
+    def _create_users(self):
+        users = [
+            User(username=f'patron{i}', password='!')  # Sin contraseña
+            for i in range(self.users)
+        ]
+        return User.objects.bulk_create(users, ignore_conflicts=True)
+
+    def _instance(self, book_id, borrowers):
+        rnd = self.copies_random
+        status = rnd.choices(list(LOAN_RATIOS), LOAN_RATIOS.values())[0]
+        due_back, borrower_id = None, None
+        if status == 'o':
+            # Una parte de los préstamos ya está vencida
+            due_back = self.today + dt.timedelta(days=rnd.randint(-14, 28))
+            if borrowers:
+                borrower_id = rnd.choice(borrowers)
+        return BookInstance(
+            id=uuid.UUID(int=rnd.getrandbits(128), version=4),
+            book_id=book_id, imprint=f'Imprint {rnd.randint(1, 50)}',
+            due_back=due_back, borrower_id=borrower_id, status=status)
+
+    def generate(self, progress=None):
+        """Inserta todos los datos; devuelve ``(libros, copias)``."""
+        self._create_users()
+        borrowers = list(User.objects.filter(
+            username__startswith='patron').values_list('pk', flat=True))
+        loader = CatalogLoader(batch_size=self.batch_size)
+        copies = 0
+        for chunk in chunked(self.book_records(), self.batch_size):
+            with transaction.atomic():
+                books = loader.load_chunk(chunk)
+                instances = [
+                    self._instance(book.pk, borrowers)
+                    for book in books
+                    for _ in range(self._copies())
+                ]
+                BookInstance.objects.bulk_create(
+                    instances, batch_size=self.batch_size)
+            copies += len(instances)
+            if progress is not None:
+                progress(loader.books, copies)
+        loader.invalidate()
+        return loader.books, copies
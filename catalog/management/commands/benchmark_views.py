@@ -0,0 +1,114 @@
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from catalog import api, urls
+from catalog.models import Author, Book, BookInstance, Genre, Language
+
+
+ROW = '{:<24} {:>6} {:>8} {:>8} {:>8}'
+
+
+def percentile(values, p):
+    """Percentil ``p`` (0-100) por el método del rango más cercano."""
+    values = sorted(values)
+    k = max(0, min(len(values) - 1, round(p / 100 * len(values)) - 1))
+    return values[k]
+
+
+class Command(BaseCommand):
+    help = ('Pide cada URL de catalog/urls.py varias veces y muestra la '
+            'latencia p50/p99 y el número de consultas de cada vista.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--anonymous', action='store_true',
+                            help='Sin iniciar sesión (las vistas '
+                                 'protegidas redirigen al login).')
+
+    def sample_kwargs(self):
+        """Objetos de ejemplo para las URLs con ``pk``, por modelo."""
+        book = Book.objects.annotate(n=Count('bookinstance')).order_by(
+            '-n', 'pk').first()
+        author = Author.objects.annotate(n=Count('book')).order_by(
+            '-n', 'pk').first()
+        copy = BookInstance.objects.on_loan().first()
+        samples = {Book: book, Author: author, BookInstance: copy}
+        for model in (Genre, Language):
+            samples[model] = model.objects.order_by('pk').first()
+        return {model: obj and obj.pk for model, obj in samples.items()}
+
+    def sample_model(self, pattern):
+        """Modelo del ``pk`` de la URL."""
+        resource = pattern.default_args.get('resource')
+        if resource is not None:
+            return api.RESOURCES[resource].model
+        if 'renew' in pattern.name:
+            return BookInstance
+        if 'author' in pattern.name:
+            return Author
+        return Book
+
+    def targets(self):
+        samples = self.sample_kwargs()
+        for pattern in urls.urlpatterns:
+            if set(pattern.pattern.converters) - {'pk'}:
+                continue  # Sin valores de ejemplo (p. ej. las exportaciones)
+            kwargs = {}
+            if 'pk' in pattern.pattern.converters:
+                kwargs['pk'] = samples[self.sample_model(pattern)]
+                if kwargs['pk'] is None:
+                    continue
+            yield pattern.name, reverse(pattern.name, kwargs=kwargs)
+
+    def client(self, user):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def benchmark_user(self):
+        """Superusuario temporal, sin contraseña; se borra al acabar."""
+        user = User(username=f'benchmark-{uuid.uuid4().hex[:8]}',
+                    is_staff=True, is_superuser=True)
+        user.set_unusable_password()
+        user.save()
+        return user
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        user = None if options['anonymous'] else self.benchmark_user()
+        client = self.client(user)
+        try:
+            self.run(client, options)
+        finally:
+            if user is not None:
+                client.logout()  # También borra su sesión
+                user.delete()
+
+    def run(self, client, options):
+        self.stdout.write(ROW.format(
+            'view', 'status', 'p50 ms', 'p99 ms', 'queries'))
+        for name, url in self.targets():
+            for _ in range(options['warmup']):
+                client.get(url)
+            timings, queries = [], []
+            for _ in range(options['repeat']):
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    timings.append((time.perf_counter() - start) * 1000)
+                queries.append(len(ctx))
+            self.stdout.write(ROW.format(
+                name, response.status_code,
+                f'{percentile(timings, 50):.1f}',
+                f'{percentile(timings, 99):.1f}',
+                percentile(queries, 50)))
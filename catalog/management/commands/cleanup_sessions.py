@@ -0,0 +1,30 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = ('Borra las sesiones caducadas. Con los backends de BD lo hace '
+            'por lotes para no bloquear la tabla de sesiones.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            # Cookies firmadas o caché: caducan solas
+            store.clear_expired()
+            return
+        model = store.get_model_class()
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        batch, total = options['batch_size'], 0
+        while True:
+            keys = list(expired.values_list('pk', flat=True)[:batch])
+            if not keys:
+                break
+            total += model.objects.filter(pk__in=keys).delete()[0]
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {total} expired sessions'))
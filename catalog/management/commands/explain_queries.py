@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from catalog.models import Author, Book, BookInstance
+
+
+class Command(BaseCommand):
+    help = ('Muestra el plan de ejecución de las consultas más usadas del '
+            'catálogo (para comprobar que usan los índices).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true',
+                            help='Ejecuta las consultas (EXPLAIN ANALYZE).')
+
+    def queries(self):
+        borrower = User.objects.order_by('pk').first()
+        return {
+            'all-borrowed': BookInstance.objects.on_loan().order_by(
+                'due_back')[:10],
+            'my-borrowed': BookInstance.objects.on_loan().filter(
+                borrower=borrower).order_by('due_back')[:10],
+            'books': Book.objects.order_by('title')[:10],
+            'authors': Author.objects.order_by(
+                'first_name', 'last_name')[:10],
+        }
+
+    def handle(self, *args, **options):
+        # ANALYZE solo lo entienden algunos motores (p.ej. PostgreSQL)
+        kwargs = {'analyze': True} if options['analyze'] else {}
+        for name, qs in self.queries().items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(qs.explain(**kwargs))
+            self.stdout.write('')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from catalog.generator import CatalogGenerator
+
+
+class Command(BaseCommand):
+    help = ('Genera un catálogo sintético determinista (autores, libros, '
+            'géneros, idiomas, copias y prestatarios).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--books', type=int, default=1000)
+        parser.add_argument('--authors', type=int, default=200)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--copies-per-book', type=float, default=3)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        generator = CatalogGenerator(
+            seed=options['seed'], books=options['books'],
+            authors=options['authors'], users=options['users'],
+            copies_per_book=options['copies_per_book'],
+            batch_size=options['batch_size'])
+
+        def progress(books, copies):
+            self.stdout.write(f'{books} books, {copies} copies')
+
+        books, copies = generator.generate(progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {books} books and {copies} copies'))
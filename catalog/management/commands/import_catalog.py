@@ -0,0 +1,44 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.loader import CatalogLoader, read_records
+
+
+class Command(BaseCommand):
+    help = ('Importa un volcado del catálogo (CSV o JSONL, un libro por '
+            'registro) por lotes con bulk_create.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Fichero CSV o JSONL.')
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Por defecto, según la extensión.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--warm', action='store_true',
+                            help='Precalienta la caché de páginas después.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or path.rsplit('.', 1)[-1].lower()
+        if fmt not in ('csv', 'jsonl'):
+            raise CommandError(f'Unknown format for {path}; use --format')
+        start = time.monotonic()
+
+        def progress(loader):
+            rate = loader.books / max(time.monotonic() - start, 1e-6)
+            self.stdout.write(
+                f'{loader.books} books, {loader.copies} copies '
+                f'({rate:.0f} books/s)')
+
+        loader = CatalogLoader(batch_size=options['batch_size'])
+        try:
+            with open(path, newline='', encoding='utf-8') as stream:
+                loader.load(read_records(stream, fmt), progress=progress)
+        except (KeyError, ValueError) as e:
+            raise CommandError(f'Invalid record: {e}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {loader.books} books and {loader.copies} copies in '
+            f'{time.monotonic() - start:.1f}s'))
+        if options['warm']:
+            call_command('warm_page_cache', stdout=self.stdout)
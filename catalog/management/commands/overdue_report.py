@@ -0,0 +1,40 @@
+import csv
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from catalog.overdue import overdue_by_borrower, set_overdue_count
+
+
+class Command(BaseCommand):
+    help = ('Informe de préstamos vencidos agrupados por prestatario. '
+            'Actualiza también el contador cacheado de la barra lateral; '
+            'pensado para lanzarse periódicamente (cron).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=['text', 'csv'],
+                            default='text')
+        parser.add_argument('--date', type=date.fromisoformat,
+                            help='Fecha de referencia (AAAA-MM-DD); hoy '
+                                 'por defecto. No actualiza el contador.')
+
+    def handle(self, *args, **options):
+        today = options['date']
+        writer = None
+        if options['format'] == 'csv':
+            writer = csv.writer(self.stdout, lineterminator='\n')
+            writer.writerow(['borrower_id', 'borrower', 'loans', 'oldest'])
+        borrowers = total = 0
+        for row in overdue_by_borrower(today):
+            borrowers += 1
+            total += row[2]
+            if writer:
+                writer.writerow(row)
+            else:
+                self.stdout.write(
+                    f'{row[1]}: {row[2]} overdue since {row[3]}')
+        if today is None:
+            set_overdue_count(total)
+        if writer is None:
+            self.stdout.write(self.style.SUCCESS(
+                f'{total} overdue loans, {borrowers} borrowers'))
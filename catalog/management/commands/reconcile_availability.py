@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from catalog.models import AVAILABILITY_FIELDS, Book, BookInstance
+
+
+class Command(BaseCommand):
+    help = ('Comprueba los contadores de disponibilidad de Book contra sus '
+            'copias y corrige los que se hayan desviado.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Solo informa, no corrige.')
+
+    def handle(self, *args, **options):
+        fields = ['copies_total', *AVAILABILITY_FIELDS.values()]
+        drift = Q()
+        for f in fields:
+            drift |= ~Q(**{f: F(f'actual_{f}')})
+        drifted = Book.objects.with_actual_availability().filter(drift)
+        ids = list(drifted.values_list('pk', flat=True))
+        if not ids:
+            self.stdout.write(self.style.SUCCESS('No drift found'))
+            return
+        self.stdout.write(f'{len(ids)} books with drifted counters')
+        if options['dry_run']:
+            return
+        # Por lotes de REFRESH_BATCH, como el resto de recuentos: sin una
+        # lista IN enorme ni un bloqueo largo sobre toda la tabla
+        copies = BookInstance.objects.all()
+        copies._refresh_books(ids)
+        copies._invalidate_pages(ids, True)
+        self.stdout.write(self.style.SUCCESS(f'Repaired {len(ids)} books'))
@@ -0,0 +1,39 @@
+import math
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from catalog.models import Author, Book
+from catalog.views import AuthorListView, BookListView
+
+
+class Command(BaseCommand):
+    help = ('Precalienta la caché de páginas de los anónimos: listados de '
+            'libros y autores y las fichas más recientes.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--list-pages', type=int, default=10,
+                            help='Páginas de cada listado.')
+        parser.add_argument('--details', type=int, default=100,
+                            help='Fichas de libros y de autores.')
+
+    def urls(self, list_pages, details):
+        for name, view, model in (('books', BookListView, Book),
+                                  ('authors', AuthorListView, Author)):
+            pages = math.ceil(model.objects.count() / view.paginate_by)
+            for page in range(1, min(pages, list_pages) + 1):
+                yield f'{reverse(name)}?page={page}'
+        for model in (Book, Author):
+            pks = model.objects.order_by('-pk').values_list('pk', flat=True)
+            for pk in pks[:details]:
+                yield model(pk=pk).get_absolute_url()
+
+    @override_settings(ALLOWED_HOSTS=['testserver'])
+    def handle(self, *args, **options):
+        client = Client()
+        warmed = 0
+        for url in self.urls(options['list_pages'], options['details']):
+            warmed += client.get(url).status_code == 200
+        self.stdout.write(self.style.SUCCESS(f'Warmed {warmed} pages'))
@@ -0,0 +1,322 @@
+"""
+Middleware de instrumentación del catálogo.
+
+Todos valen para WSGI y para ASGI (``CatalogMiddleware``): con ASGI las
+peticiones pasan por ``__acall__`` sin ocupar un hilo, y Django no tiene
+que adaptar la cadena a síncrona, lo que anularía las vistas asíncronas
+de ``CATALOG_ASYNC_VIEWS``.
+"""
+
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import (
+    iscoroutinefunction, markcoroutinefunction, sync_to_async,
+)
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import get_conditional_response
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .pagecache import current_epoch, get_page, set_page
+from .routers import use_replica
+
+
+logger = logging.getLogger('catalog.timing')
+
+
+class QueryCollector:
+    """``execute_wrapper`` que cuenta y cronometra las consultas SQL."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.statements[sql] += 1
+
+
+class Measure:
+    """Estado de una petición medida por ``QueryTimingMiddleware``."""
+
+    def __init__(self):
+        self.collector = QueryCollector()
+        self.stack = ExitStack()
+        self.pooled = []
+        self.start = None
+
+
+class CatalogMiddleware:
+    """
+    Base de los middlewares síncronos y asíncronos: con un
+    ``get_response`` asíncrono ``__call__`` delega en ``__acall__``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class StaticFilesMiddleware(CatalogMiddleware, WhiteNoiseMiddleware):
+    """
+    ``WhiteNoiseMiddleware`` también asíncrono (el de WhiteNoise 5.2 solo
+    es síncrono). En modo asíncrono los ficheros se abren en un hilo; el
+    resto de peticiones siguen sin salir del bucle de eventos.
+    """
+
+    def __init__(self, get_response):
+        WhiteNoiseMiddleware.__init__(self, get_response)
+        CatalogMiddleware.__init__(self, get_response)
+
+    def handle(self, request):
+        return WhiteNoiseMiddleware.__call__(self, request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(
+                request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+        return await sync_to_async(self.serve, thread_sensitive=False)(
+            static_file, request)
+
+
+class QueryTimingMiddleware(CatalogMiddleware):
+    """
+    Mide, para una muestra de las peticiones, el número de consultas, el
+    tiempo de BD, el de renderizado de plantillas y la vista atendida.
+
+    Lo publica en la cabecera ``Server-Timing`` y como una línea JSON en el
+    logger ``catalog.timing``. Si una misma sentencia SQL se repite al menos
+    ``QUERY_TIMING_REPEAT_THRESHOLD`` veces (patrón N+1) se registra un
+    aviso. ``QUERY_TIMING_SAMPLE_RATE`` (0-1) es la fracción de peticiones
+    medidas; con 0 el middleware no hace nada. Con el pool de conexiones
+    incluye también la espera para obtener una conexión.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sample_rate = getattr(settings, 'QUERY_TIMING_SAMPLE_RATE', 0)
+        self.threshold = getattr(
+            settings, 'QUERY_TIMING_REPEAT_THRESHOLD', 5)
+
+    def sampled(self):
+        return self.sample_rate and random.random() < self.sample_rate
+
+    def handle(self, request):
+        if not self.sampled():
+            return self.get_response(request)
+        measure = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            measure.stack.close()
+        self.finish(request, response, measure)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        # Las conexiones son de cada hilo: se instrumentan las del hilo en
+        # el que sync_to_async ejecuta las consultas de esta petición
+        measure = await sync_to_async(self.start)(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(measure.stack.close)()
+        await sync_to_async(self.finish)(request, response, measure)
+        return response
+
+    def start(self, request):
+        measure = Measure()
+        request._timing = {'view': None, 'render': 0.0}
+        # Conexiones tomadas de un pool (catalog.pooled_postgresql)
+        measure.pooled = [
+            c for c in connections.all() if hasattr(c, 'pool_wait')]
+        for conn in measure.pooled:
+            conn.pool_wait = 0.0
+        for conn in connections.all():
+            measure.stack.enter_context(
+                conn.execute_wrapper(measure.collector))
+        measure.start = time.perf_counter()
+        return measure
+
+    def finish(self, request, response, measure):
+        total = time.perf_counter() - measure.start
+        if measure.pooled:
+            request._timing['pool'] = sum(
+                c.pool_wait for c in measure.pooled)
+        self.report(request, response, measure.collector, total)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if hasattr(request, '_timing'):
+            func = getattr(view_func, 'view_class', view_func)
+            request._timing['view'] = f'{func.__module__}.{func.__qualname__}'
+
+    def process_template_response(self, request, response):
+        # El renderizado empieza justo después de este hook
+        if hasattr(request, '_timing'):
+            start = time.perf_counter()
+
+            def rendered(response):
+                request._timing['render'] = time.perf_counter() - start
+            response.add_post_render_callback(rendered)
+        return response
+
+    def report(self, request, response, collector, total):
+        timing = request._timing
+        db_ms = collector.duration * 1000
+        render_ms = timing['render'] * 1000
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={db_ms:.1f};desc="{collector.count} queries"',
+            f'tpl;dur={render_ms:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ))
+        if 'pool' in timing:
+            pool_ms = timing['pool'] * 1000
+            response['Server-Timing'] += f', pool;dur={pool_ms:.1f}'
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': timing['view'],
+            'status': response.status_code,
+            'queries': collector.count,
+            'db_ms': round(db_ms, 1),
+            'render_ms': round(render_ms, 1),
+            'total_ms': round(total * 1000, 1),
+        }
+        if 'pool' in timing:
+            record['pool_wait_ms'] = round(timing['pool'] * 1000, 1)
+        logger.info(json.dumps(record))
+
+        if collector.statements:
+            sql, repeats = collector.statements.most_common(1)[0]
+            if repeats >= self.threshold:
+                record.update(repeated_sql=sql, repeats=repeats)
+                logger.warning('Possible N+1 query: %s', json.dumps(record))
+
+
+# Cookie que fija las lecturas a la primaria tras una escritura
+STICKY_COOKIE = 'catalog_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaMiddleware(CatalogMiddleware):
+    """
+    Envía a la réplica las lecturas de las vistas marcadas con
+    ``use_replica`` (ver ``catalog/routers.py``).
+
+    Tras una petición que no sea de lectura (POST, etc.) el navegador recibe
+    la cookie ``STICKY_COOKIE`` durante ``REPLICA_STICKY_SECONDS``, y
+    mientras la tenga sus lecturas van a la primaria: así ve sus propios
+    cambios aunque la réplica vaya con retraso.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sticky = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+    def handle(self, request):
+        token = use_replica.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        return self.stick(request, response)
+
+    async def __acall__(self, request):
+        # sync_to_async devuelve a este contexto lo que process_view fije
+        token = use_replica.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            use_replica.reset(token)
+        return self.stick(request, response)
+
+    def stick(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(STICKY_COOKIE, '1', max_age=self.sticky,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        if (getattr(view, 'use_replica', False)
+                and request.method in SAFE_METHODS
+                and STICKY_COOKIE not in request.COOKIES):
+            use_replica.set(True)
+            request.reads_from_replica = True
+
+
+class PageCacheMiddleware(CatalogMiddleware):
+    """
+    Sirve a los usuarios anónimos las páginas cacheadas de las vistas con
+    ``page_cache`` (ver ``catalog/pagecache.py``) y guarda las que no lo
+    estaban.
+    """
+
+    def handle(self, request):
+        response = self.get_response(request)
+        if self.cacheable(request, response):
+            self.store(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self.cacheable(request, response):
+            await sync_to_async(self.store)(request, response)
+        return response
+
+    def cacheable(self, request, response):
+        return (getattr(request, 'page_cache_tags', None) is not None
+                and request.method == 'GET'
+                and getattr(request, '_page_cacheable', False)
+                and response.status_code == 200 and not response.cookies)
+
+    def store(self, request, response):
+        set_page(request, response, request.page_cache_tags,
+                 request._page_cache_epoch,
+                 getattr(request, 'reads_from_replica', False))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        if (not getattr(settings, 'PAGE_CACHE_ENABLED', True)
+                or not getattr(view, 'page_cache', False)
+                or request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return None
+        request._page_cacheable = True
+        response = get_page(request)
+        if response is None:
+            # Antes de que la vista lea nada (ver catalog/pagecache.py)
+            request._page_cache_epoch = current_epoch()
+            return None
+        return get_conditional_response(
+            request, etag=response.get('ETag'), response=response)
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.2 on 2026-10-18 09:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_delete_staff_alter_book_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='genre',
+            field=models.ManyToManyField(help_text='Seleccione un genero', to='catalog.genre'),
+        ),
+        migrations.AlterField(
+            model_name='genre',
+            name='name',
+            field=models.CharField(help_text='Ingrese el género (p.ej.Ciencia Ficción, Poesía Francesa..)', max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='language',
+            name='name',
+            field=models.CharField(help_text='Ingrese el nombre del lenguaje (pe., Inglés, Español, Francés, etc.)', max_length=200),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['first_name', 'last_name'], name='author_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['title'], name='book_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookinstance',
+            index=models.Index(fields=['status', 'due_back'], name='bi_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookinstance',
+            index=models.Index(fields=['borrower', 'status', 'due_back'], name='bi_borrower_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookinstance',
+            index=models.Index(condition=models.Q(('status', 'o')), fields=['due_back'], name='bi_on_loan_due_idx'),
+        ),
+    ]
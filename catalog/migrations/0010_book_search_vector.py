@@ -0,0 +1,48 @@
+# Generated by Django 4.2.2 on 2026-10-18 09:43
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Mismo documento que catalog.search.search_document()
+FILL_SQL = """
+UPDATE catalog_book AS b SET search_vector =
+    setweight(to_tsvector('simple', coalesce(b.title, '')), 'A')
+    || setweight(to_tsvector('simple', coalesce((
+        SELECT a.first_name || ' ' || a.last_name
+        FROM catalog_author AS a WHERE a.id = b.author_id), '')), 'A')
+    || setweight(to_tsvector('simple', coalesce(b.isbn, '')), 'A')
+    || setweight(to_tsvector('simple', coalesce(b.summary, '')), 'B')
+"""
+
+
+def create_search_index(apps, schema_editor):
+    # El índice GIN y el tsvector solo existen en PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX book_search_vector_idx ON catalog_book '
+        'USING gin (search_vector)')
+    schema_editor.execute(FILL_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS book_search_vector_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.2 on 2026-10-18 09:53
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Book = apps.get_model('catalog', 'Book')
+    BookInstance = apps.get_model('catalog', 'BookInstance')
+    using = schema_editor.connection.alias
+
+    def count(status=None):
+        copies = BookInstance.objects.using(using).filter(book=OuterRef('pk'))
+        if status is not None:
+            copies = copies.filter(status=status)
+        n = copies.order_by().values('book').annotate(
+            n=Count('pk')).values('n')
+        return Coalesce(Subquery(n), 0)
+
+    Book.objects.using(using).update(
+        copies_total=count(),
+        copies_available=count('a'),
+        copies_on_loan=count('o'),
+        copies_reserved=count('r'),
+        copies_maintenance=count('m'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_book_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='copies_available',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='copies_maintenance',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='copies_on_loan',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='copies_reserved',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='copies_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
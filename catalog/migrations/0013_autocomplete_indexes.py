@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+# Búsqueda por prefijo sin distinguir mayúsculas (``istartswith``), que
+# Django traduce en PostgreSQL a ``UPPER(col::text) LIKE UPPER('q%')``
+INDEXES = {
+    'author_last_name_upper_idx': ('catalog_author', 'last_name'),
+    'author_first_name_upper_idx': ('catalog_author', 'first_name'),
+    'book_title_upper_idx': ('catalog_book', 'title'),
+    'genre_name_upper_idx': ('catalog_genre', 'name'),
+    'language_name_upper_idx': ('catalog_language', 'name'),
+    'auth_user_username_upper_idx': ('auth_user', 'username'),
+}
+
+
+def create_indexes(apps, schema_editor):
+    # text_pattern_ops y los índices de expresiones son de PostgreSQL
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, (table, column) in INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'(UPPER({column}::text) text_pattern_ops)')
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('catalog', '0012_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -1,10 +1,16 @@
 from datetime import date
 import uuid  # Requerida para las instancias de libros únicos
 
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import connections, models, router, transaction
+from django.db.models import Case, Count, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth.models import User
 
+from .pagecache import invalidate_tags
+
 
 class Genre(models.Model):
     """
@@ -20,6 +26,77 @@ class Genre(models.Model):
         return self.name
 
 
+# Contador desnormalizado de Book para cada estado de BookInstance
+AVAILABILITY_FIELDS = {
+    'a': 'copies_available',
+    'o': 'copies_on_loan',
+    'r': 'copies_reserved',
+    'm': 'copies_maintenance',
+}
+
+# Libros por UPDATE al recontar: por debajo del límite de 999 parámetros
+# de SQLite
+REFRESH_BATCH = 500
+
+DERIVED_FIELDS = ('copies_total', *AVAILABILITY_FIELDS.values(),
+                  'search_vector')
+
+
+def _copies_count(status=None):
+    """Subconsulta con el número de copias (en ``status``) de cada libro."""
+    copies = BookInstance.objects.filter(book=OuterRef('pk'))
+    if status is not None:
+        copies = copies.filter(status=status)
+    n = copies.order_by().values('book').annotate(n=Count('pk')).values('n')
+    return Coalesce(Subquery(n), 0)
+
+
+class BookQuerySet(models.QuerySet):
+    """
+    Perfiles de consulta reutilizables para las vistas de libros.
+    """
+    def for_list(self):
+        """Solo lo que pinta ``book_list.html``, con el autor en un JOIN."""
+        return self.select_related('author').only(
+            'title', 'author__first_name', 'author__last_name',
+            'copies_total', 'copies_available')
+
+    def with_actual_availability(self):
+        """Anota los contadores recalculados a partir de las copias."""
+        return self.annotate(
+            actual_copies_total=_copies_count(),
+            **{f'actual_{f}': _copies_count(s)
+               for s, f in AVAILABILITY_FIELDS.items()})
+
+    def refresh_availability(self):
+        """
+        Recalcula los contadores de disponibilidad de estos libros con un
+        único UPDATE.
+
+        Antes bloquea los libros (en orden de ``pk``, sin interbloqueos):
+        otra transacción que esté cambiando sus copias espera a que esta
+        acabe, y en READ COMMITTED el UPDATE, una sentencia posterior al
+        bloqueo, ya cuenta las copias que la otra haya confirmado.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            if connections[self.db].features.has_select_for_update:
+                list(self.select_for_update().order_by('pk').values_list(
+                    'pk', flat=True))
+            return self.update(
+                updated_at=timezone.now(),
+                copies_total=_copies_count(),
+                **{f: _copies_count(s)
+                   for s, f in AVAILABILITY_FIELDS.items()})
+
+    def for_detail(self):
+        """
+        Autor e idioma en un JOIN y géneros y copias precargados: la ficha
+        cuesta lo mismo tenga el libro una copia o cientos.
+        """
+        return self.select_related('author', 'language').prefetch_related(
+            'genre', 'bookinstance_set').defer('search_vector')
+
+
 class Book(models.Model):
     """
     Modelo que representa un libro (pero no un Ejemplar específico).
@@ -34,16 +111,49 @@ class Book(models.Model):
     genre = models.ManyToManyField(Genre, help_text="Seleccione un genero")
     laux = "language"
     language = models.ForeignKey(laux, on_delete=models.SET_NULL, null=True)
+    # Documento de búsqueda (solo PostgreSQL), mantenido en catalog.search
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Copias por estado, mantenidas por BookInstance (ver
+    # BookQuerySet.refresh_availability y el comando reconcile_availability)
+    copies_total = models.PositiveIntegerField(default=0, editable=False)
+    copies_available = models.PositiveIntegerField(default=0, editable=False)
+    copies_on_loan = models.PositiveIntegerField(default=0, editable=False)
+    copies_reserved = models.PositiveIntegerField(default=0, editable=False)
+    copies_maintenance = models.PositiveIntegerField(
+        default=0, editable=False)
+    # Validadores HTTP (ETag / Last-Modified), ver catalog/conditional.py
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookQuerySet.as_manager()
 
     class Meta:
         ordering = ["title"]
         permissions = (("can_mark_returned", "Set book as returned"),)
+        indexes = [
+            models.Index(fields=['title'], name='book_title_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Los contadores y el documento de búsqueda se mantienen con UPDATEs
+        # propios: no se pisan con los valores (quizá viejos) en memoria
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            skip = {*DERIVED_FIELDS, *self.get_deferred_fields()}
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in skip
+            ]
+        super().save(*args, **kwargs)
 
     def display_genre(self):
         """
         Creates a string to display genre in Admin.
         """
-        return ', '.join(genre.name for genre in self.genre.all()[:3])
+        if 'genre' in getattr(self, '_prefetched_objects_cache', {}):
+            # Sin recortar: así aprovecha prefetch_related('genre')
+            genres = list(self.genre.all())[:3]
+        else:
+            genres = self.genre.all()[:3]
+        return ', '.join(genre.name for genre in genres)
 
     display_genre.short_description = 'Genre'
 
@@ -60,6 +170,128 @@ class Book(models.Model):
         return reverse('book-detail', args=[str(self.id)])
 
 
+class BookInstanceQuerySet(models.QuerySet):
+    """
+    Perfiles de consulta reutilizables para las listas de préstamos.
+    """
+    def on_loan(self):
+        return self.filter(status__exact='o')
+
+    def overdue(self, today=None):
+        """Préstamos vencidos; usa el índice parcial de los prestados."""
+        today = today or date.today()
+        return self.on_loan().filter(due_back__lt=today)
+
+    def with_overdue(self, today=None):
+        """
+        Anota ``overdue`` (bool) calculado en SQL para filtrar u ordenar;
+        a diferencia de ``BookInstance.is_overdue``, solo las prestadas.
+        """
+        today = today or date.today()
+        return self.annotate(overdue=Case(
+            When(status='o', due_back__lt=today, then=Value(True)),
+            default=Value(False), output_field=models.BooleanField()))
+
+    def for_loan_list(self):
+        """
+        Lo que pintan los ``bookinstance_list_*``: libro y prestatario en
+        un JOIN, sin cargar resúmenes ni el resto de columnas de usuario.
+        """
+        return self.select_related('book', 'borrower').only(
+            'due_back', 'status', 'book__title', 'borrower__username')
+
+    # Las operaciones masivas no pasan por BookInstance.save() ni emiten
+    # señales: recalculan aquí los contadores de los libros afectados, en la
+    # misma transacción, e invalidan sus páginas cacheadas, los contadores de
+    # la página de inicio y el de préstamos vencidos. Los libros se leen
+    # antes de escribir (después las copias ya no cumplen el filtro o no
+    # existen), sin repetir, y se recuentan por lotes de REFRESH_BATCH
+
+    def _book_ids(self):
+        return set(self.order_by().values_list('book_id', flat=True)
+                   .distinct())
+
+    def _refresh_books(self, book_ids):
+        book_ids = sorted({pk for pk in book_ids if pk is not None})
+        books = Book.objects.using(self.db)
+        for i in range(0, len(book_ids), REFRESH_BATCH):
+            books.filter(
+                pk__in=book_ids[i:i + REFRESH_BATCH]).refresh_availability()
+
+    def _invalidate_overdue(self):
+        # catalog.overdue importa este módulo
+        from .overdue import invalidate_overdue_count
+        invalidate_overdue_count()
+
+    def _invalidate_stats(self):
+        # Como catalog.overdue, catalog.stats importa este módulo
+        from .stats import invalidate_stats
+        invalidate_stats()
+
+    def _invalidate_pages(self, book_ids, counters):
+        tags = {f'book:{pk}' for pk in book_ids if pk is not None}
+        if counters:
+            tags.add('books')
+        if tags:
+            invalidate_tags(tags)
+
+    def update(self, **kwargs):
+        # auto_now solo actúa en save()
+        kwargs.setdefault('updated_at', timezone.now())
+        counters = bool({'status', 'book', 'book_id'} & kwargs.keys())
+        with transaction.atomic(using=self.db):
+            book_ids = self._book_ids()
+            rows = super().update(**kwargs)
+            if counters:
+                book = kwargs.get('book', kwargs.get('book_id'))
+                # Una expresión (bulk_update) no dice a qué libros van
+                if not hasattr(book, 'resolve_expression'):
+                    book_ids.add(getattr(book, 'pk', book))
+                self._refresh_books(book_ids)
+        self._invalidate_pages(book_ids, counters)
+        if 'status' in kwargs:
+            self._invalidate_stats()
+        if {'status', 'due_back'} & kwargs.keys():
+            self._invalidate_overdue()
+        return rows
+
+    def delete(self):
+        # Las señales post_delete ya invalidan las páginas
+        with transaction.atomic(using=self.db):
+            book_ids = self._book_ids()
+            result = super().delete()
+            self._refresh_books(book_ids)
+        self._invalidate_stats()
+        self._invalidate_overdue()
+        return result
+
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            book_ids = {obj.book_id for obj in objs}
+            self._refresh_books(book_ids)
+        self._invalidate_pages(book_ids, True)
+        self._invalidate_stats()
+        self._invalidate_overdue()
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        # QuerySet.bulk_update() escribe con update(), que ya recuenta los
+        # libros de los que salen las copias; aquí faltan los de destino
+        objs = list(objs)
+        moved = bool({'book', 'book_id'} & set(fields))
+        with transaction.atomic(using=self.db):
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            book_ids = {obj.book_id for obj in objs}
+            if moved:
+                self._refresh_books(book_ids)
+        for obj in objs:
+            obj._loaded_availability = (obj.book_id, obj.status)
+        if moved:
+            self._invalidate_pages(book_ids, True)
+        return rows
+
+
 class BookInstance(models.Model):
     """
     Modelo que representa una copia específica de un libro
@@ -72,6 +304,8 @@ class BookInstance(models.Model):
     a = models.SET_NULL
     borrower = models.ForeignKey(User, on_delete=a, null=True, blank=True)
 
+    objects = BookInstanceQuerySet.as_manager()
+
     @property
     def is_overdue(self):
         return self.due_back and date.today() > self.due_back
@@ -87,9 +321,20 @@ class BookInstance(models.Model):
     c = LOAN_STATUS
     aux = models.CharField
     status = aux(max_length=1, choices=c, blank=True, default='m', help_text=t)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["due_back"]
+        indexes = [
+            # Listas de préstamos: filtran por estado (y prestatario) y
+            # ordenan por fecha de devolución
+            models.Index(fields=['status', 'due_back'],
+                         name='bi_status_due_idx'),
+            models.Index(fields=['borrower', 'status', 'due_back'],
+                         name='bi_borrower_status_due_idx'),
+            models.Index(fields=['due_back'], name='bi_on_loan_due_idx',
+                         condition=models.Q(status='o')),
+        ]
 
     def __str__(self):
         """
@@ -97,6 +342,45 @@ class BookInstance(models.Model):
         """
         return f'{self.id} ({self.book.title})'
 
+    def _write_db(self):
+        return router.db_for_write(type(self), instance=self)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Libro y estado cargados, para saber qué contadores cambian
+        loaded = dict(zip(field_names, values))
+        instance._loaded_availability = (
+            loaded.get('book_id'), loaded.get('status'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_availability', None)
+        current = (self.book_id, self.status)
+        using = kwargs.get('using') or self._write_db()
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            if loaded != current:
+                books = {current[0], loaded[0] if loaded else None}
+                type(self).objects.using(using)._refresh_books(books)
+        self._loaded_availability = current
+
+    def delete(self, *args, **kwargs):
+        using = kwargs.get('using') or self._write_db()
+        with transaction.atomic(using=using):
+            result = super().delete(*args, **kwargs)
+            type(self).objects.using(using)._refresh_books([self.book_id])
+        return result
+
+
+class AuthorQuerySet(models.QuerySet):
+    """
+    Perfiles de consulta reutilizables para las vistas de autores.
+    """
+    def for_detail(self):
+        """Autor con sus libros precargados en una segunda consulta."""
+        return self.prefetch_related('book_set')
+
 
 class Author(models.Model):
     """
@@ -107,9 +391,16 @@ class Author(models.Model):
     b = 'birth'
     date_of_birth = models.DateField(null=True, blank=True, verbose_name=b)
     date_of_death = models.DateField('died', null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = AuthorQuerySet.as_manager()
 
     class Meta:
         ordering = ["first_name", "last_name"]
+        indexes = [
+            models.Index(fields=['first_name', 'last_name'],
+                         name='author_name_idx'),
+        ]
 
     def get_absolute_url(self):
         """
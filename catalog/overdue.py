@@ -0,0 +1,60 @@
+"""
+Préstamos vencidos: informe por prestatario y contador cacheado.
+
+El contador de la barra lateral del staff se guarda por día (cambia solo
+con la fecha) y caduca a los ``OVERDUE_COUNT_TIMEOUT`` segundos; las
+señales de ``catalog.signals`` lo descartan al guardar o borrar copias.
+``manage.py overdue_report`` lo recalcula al generar el informe, así que
+programado (cron) lo mantiene caliente.
+"""
+
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min
+
+from .models import BookInstance as BII
+
+
+CHUNK_SIZE = 2000
+
+
+def _key(today):
+    return f'catalog:overdue-count:{today.isoformat()}'
+
+
+def _timeout():
+    return getattr(settings, 'OVERDUE_COUNT_TIMEOUT', 3600)
+
+
+def overdue_by_borrower(today=None):
+    """
+    Filas ``(borrower_id, username, préstamos, vencimiento más antiguo)``
+    agregadas en SQL y leídas por lotes, ordenadas por usuario.
+    """
+    qs = BII.objects.overdue(today).values(
+        'borrower_id', 'borrower__username').annotate(
+        loans=Count('pk'), oldest=Min('due_back')).order_by(
+        'borrower__username', 'borrower_id').values_list(
+        'borrower_id', 'borrower__username', 'loans', 'oldest')
+    return qs.iterator(chunk_size=CHUNK_SIZE)
+
+
+def get_overdue_count():
+    """Número de préstamos vencidos hoy, desde la caché si es posible."""
+    today = date.today()
+    count = cache.get(_key(today))
+    if count is None:
+        count = set_overdue_count(BII.objects.overdue(today).count(), today)
+    return count
+
+
+def set_overdue_count(count, today=None):
+    cache.set(_key(today or date.today()), count, _timeout())
+    return count
+
+
+def invalidate_overdue_count(**kwargs):
+    """Receptor de señales: descarta el contador de hoy."""
+    cache.delete(_key(date.today()))
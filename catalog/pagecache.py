@@ -0,0 +1,166 @@
+"""
+Caché de páginas completas para los usuarios anónimos.
+
+``PageCacheMiddleware`` (``catalog/middleware.py``) guarda la respuesta de
+las vistas con ``PageCacheMixin`` por URL completa (ruta y query string)
+en la caché ``PAGE_CACHE_ALIAS``. Cada página se guarda con las etiquetas
+de lo que pinta (``book:<pk>``, ``author:<pk>``, ``books``...) y la
+generación de cada etiqueta en ese momento; las señales de ``catalog.signals``
+cambian la generación de las etiquetas afectadas, y una página con alguna
+etiqueta cambiada deja de servirse.
+
+Cada invalidación cambia además la "época" (``EPOCH_KEY``, el instante en
+nanosegundos de la última). El middleware la anota antes de ejecutar la
+vista y solo guarda la página si no ha cambiado al acabar: si algo se
+escribió mientras se pintaba, la página podría no reflejarlo. Las páginas
+leídas de la réplica tampoco se guardan durante ``REPLICA_STICKY_SECONDS``
+tras una invalidación, por si la réplica aún no tiene el cambio.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def page_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def page_key(request):
+    path = request.get_full_path().encode()
+    return f'catalog:page:{hashlib.md5(path).hexdigest()}'
+
+
+EPOCH_KEY = 'catalog:tag:epoch'
+
+
+def _tag_key(tag):
+    return f'catalog:tag:{tag}'
+
+
+def invalidate_tags(tags):
+    """Invalida las páginas que dependen de alguna de ``tags``."""
+    cache = page_cache()
+    generation = time.time_ns()
+    # La época antes que las etiquetas: quien lea ya las generaciones
+    # nuevas (set_page) verá también la época nueva
+    cache.set(EPOCH_KEY, generation, None)
+    cache.set_many({_tag_key(tag): generation for tag in tags}, None)
+
+
+def current_epoch():
+    """Época de las invalidaciones, a anotar antes de pintar la página."""
+    return page_cache().get(EPOCH_KEY, 0)
+
+
+def _generations(keys):
+    cache = page_cache()
+    generations = cache.get_many(keys)
+    missing = {k: time.time_ns() for k in keys if k not in generations}
+    if missing:
+        cache.set_many(missing, None)
+        generations.update(missing)
+    return generations
+
+
+def tag_generations(tags):
+    """Generación actual de cada una de ``tags`` (en el mismo orden)."""
+    keys = [_tag_key(tag) for tag in tags]
+    generations = _generations(keys)
+    return [generations[key] for key in keys]
+
+
+def get_page(request):
+    """Respuesta cacheada de la petición, si sigue siendo válida."""
+    cache = page_cache()
+    entry = cache.get(page_key(request))
+    if entry is None:
+        return None
+    generations, response = entry
+    current = cache.get_many(generations)
+    if current != generations:
+        return None
+    return response
+
+
+def set_page(request, response, tags, epoch, replica=False):
+    """
+    Guarda la página si no ha habido invalidaciones desde ``epoch`` (ni,
+    con ``replica``, en los últimos ``REPLICA_STICKY_SECONDS``).
+    """
+    cache = page_cache()
+    generations = _generations([_tag_key(tag) for tag in tags])
+    latest = cache.get(EPOCH_KEY, 0)
+    if latest != epoch:
+        return
+    lag = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+    if replica and time.time_ns() - latest < lag * 10 ** 9:
+        return
+    timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 600)
+    cache.set(page_key(request), (generations, response), timeout)
+
+
+class PageCacheMixin:
+    """
+    Vistas cacheables para anónimos; ``get_page_cache_tags`` devuelve las
+    etiquetas de los objetos que pinta la página.
+    """
+    page_cache = True
+
+    def get_page_cache_tags(self, context):
+        raise NotImplementedError
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        self.request.page_cache_tags = self.get_page_cache_tags(context)
+        return response
+
+
+# Receptores de señales
+
+
+def book_changed(sender, instance, **kwargs):
+    invalidate_tags({f'book:{instance.pk}', 'books',
+                     f'author-books:{instance.author_id}'})
+
+
+def copy_saved(sender, instance, **kwargs):
+    tags = {f'book:{instance.book_id}'}
+    loaded = getattr(instance, '_loaded_availability', None)
+    if loaded != (instance.book_id, instance.status):
+        # Cambian los contadores del listado (y quizá de otro libro)
+        tags.add('books')
+        if loaded and loaded[0] != instance.book_id:
+            tags.add(f'book:{loaded[0]}')
+    invalidate_tags(tags)
+
+
+def copy_deleted(sender, instance, **kwargs):
+    invalidate_tags({f'book:{instance.book_id}', 'books'})
+
+
+def author_changed(sender, instance, **kwargs):
+    invalidate_tags({f'author:{instance.pk}', 'authors'})
+
+
+def genre_changed(sender, instance, **kwargs):
+    invalidate_tags({f'genre:{instance.pk}'})
+
+
+def language_changed(sender, instance, **kwargs):
+    invalidate_tags({f'language:{instance.pk}'})
+
+
+def book_genres_changed(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_tags({f'book:{instance.pk}'})
+    elif pk_set:
+        invalidate_tags({f'book:{pk}' for pk in pk_set})
+    else:
+        # clear() desde el género: todas sus fichas
+        invalidate_tags({f'genre:{instance.pk}'})
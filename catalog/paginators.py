@@ -0,0 +1,361 @@
+"""
+Paginadores del catálogo.
+
+``KeysetPaginator`` pagina por cursor sobre las claves de ordenación del
+modelo: cada página es un ``WHERE clave > último ORDER BY clave LIMIT n``,
+sin ``COUNT(*)`` ni ``OFFSET``, así que la página 10.000 cuesta lo mismo
+que la primera.
+
+``EstimatedCountPaginator`` pagina por número de página, pero en tablas
+grandes no espera a un ``COUNT(*)``: sin filtros toma el total estimado
+por el planificador de PostgreSQL y, si no, el último total cacheado de la
+misma consulta, que se recalcula en segundo plano cuando envejece. Con un
+total estimado cada página pide una fila de más para saber si hay otra
+detrás, así que las filas que el total no cubre siguen siendo alcanzables.
+"""
+
+import hashlib
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import (
+    EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator,
+)
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.utils.functional import cached_property
+
+
+CURSOR_SALT = 'catalog.paginators.cursor'
+# Los totales cacheados que nadie pide en un día se descartan
+COUNT_TIMEOUT = 24 * 60 * 60
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class KeysetPage:
+    """Página de resultados obtenida por cursor."""
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<KeysetPage ({len(self.object_list)} objects)>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.encode(self.object_list[-1], forward=True)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        return self.paginator.encode(self.object_list[0], forward=False)
+
+
+class KeysetPaginator:
+    """
+    Paginador por cursor sobre ``ordering`` (por defecto el ``ordering``
+    del Meta del modelo más ``pk`` como desempate).
+
+    Los campos anulables se ordenan con los NULL al final en cualquier
+    motor de BD.
+    """
+
+    def __init__(self, object_list, per_page, ordering=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        opts = object_list.model._meta
+        if ordering is None:
+            ordering = list(opts.ordering)
+        ordering = [f for f in ordering if f not in ('pk', opts.pk.name)]
+        self.fields = [opts.get_field(f) for f in ordering] + [opts.pk]
+
+    def encode(self, obj, forward=True):
+        """Cursor opaco (firmado) con las claves de ``obj``."""
+        values = [
+            None if getattr(obj, f.attname) is None
+            else f.value_to_string(obj)
+            for f in self.fields
+        ]
+        return signing.dumps({'f': forward, 'k': values}, salt=CURSOR_SALT)
+
+    def decode(self, cursor):
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+            values = [
+                None if v is None else f.to_python(v)
+                for f, v in zip(self.fields, data['k'], strict=True)
+            ]
+            return bool(data['f']), values
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise InvalidCursor('Invalid cursor')
+
+    def _order_by(self, forward):
+        order = []
+        for f in self.fields:
+            expr = F(f.attname)
+            if forward:
+                order.append(expr.asc(nulls_last=True))
+            else:
+                order.append(expr.desc(nulls_first=True))
+        return order
+
+    def _beyond(self, fields, values, forward):
+        """
+        Condición de las filas estrictamente posteriores (``forward``) o
+        anteriores a ``values`` en el orden de ``fields``.
+        """
+        if not fields:
+            return Q(pk__in=[])
+        f, v = fields[0], values[0]
+        rest = self._beyond(fields[1:], values[1:], forward)
+        if v is None:
+            # Los NULL van al final: tras un NULL solo quedan otros NULL
+            tie = Q(**{f'{f.attname}__isnull': True})
+            if forward:
+                return tie & rest
+            return Q(**{f'{f.attname}__isnull': False}) | (tie & rest)
+        op = 'gt' if forward else 'lt'
+        strict = Q(**{f'{f.attname}__{op}': v})
+        if forward and f.null:
+            strict |= Q(**{f'{f.attname}__isnull': True})
+        tie = Q(**{f.attname: v})
+        return strict | (tie & rest)
+
+    def _query(self, cursor):
+        forward, values = True, None
+        if cursor:
+            forward, values = self.decode(cursor)
+        qs = self.object_list.order_by(*self._order_by(forward))
+        if values is not None:
+            qs = qs.filter(self._beyond(self.fields, values, forward))
+        return forward, values, qs[:self.per_page + 1]
+
+    def _page(self, rows, forward, values):
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            return KeysetPage(rows, self, more, values is not None)
+        rows.reverse()
+        return KeysetPage(rows, self, True, more)
+
+    def page(self, cursor=None):
+        """Devuelve la página que sigue (o precede) al ``cursor``."""
+        forward, values, qs = self._query(cursor)
+        return self._page(list(qs), forward, values)
+
+    async def apage(self, cursor=None):
+        """Versión asíncrona de ``page``."""
+        forward, values, qs = self._query(cursor)
+        return self._page([obj async for obj in qs], forward, values)
+
+
+def estimated_count(qs):
+    """
+    Filas estimadas de ``qs`` según ``pg_class.reltuples``, o ``None`` si
+    no hay estimación: otro motor, tabla sin analizar o consulta con
+    filtros, ``DISTINCT`` o recortada.
+    """
+    if not isinstance(qs, QuerySet):
+        return None
+    query = qs.query
+    if query.where or query.distinct or query.is_sliced or query.combinator:
+        return None
+    connection = connections[qs.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(qs.model._meta.db_table)])
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:  # -1: tabla nunca analizada
+        return None
+    return row[0]
+
+
+def _count_key(qs):
+    """Clave de caché del total de ``qs``; ``None`` si no hay SQL."""
+    try:
+        sql, params = qs.query.get_compiler(using=qs.db).as_sql()
+    except EmptyResultSet:  # p. ej. qs.none()
+        return None
+    digest = hashlib.md5(f'{qs.db}:{sql}:{params!r}'.encode()).hexdigest()
+    return f'catalog:count:{digest}'
+
+
+def _store_count(qs, count, key=None):
+    key = key or _count_key(qs)
+    if key is not None:
+        cache.set(key, (count, time.time()), COUNT_TIMEOUT)
+
+
+def refresh_count(qs, key=None):
+    """Cuenta ``qs`` con ``COUNT(*)`` y guarda el total en la caché."""
+    count = qs.count()
+    _store_count(qs, count, key)
+    return count
+
+
+def _ttl():
+    return getattr(settings, 'ESTIMATED_COUNT_TTL', 300)
+
+
+def _refresh(qs, key):
+    try:
+        refresh_count(qs, key)
+    finally:
+        cache.delete(f'{key}:refreshing')
+        connections[qs.db].close()
+
+
+def _refresh_later(qs, key):
+    """Recuenta ``qs`` en otro hilo (uno a la vez por consulta)."""
+    if not cache.add(f'{key}:refreshing', True, _ttl()):
+        return
+    # El hilo no hereda use_replica (catalog/routers.py): sin fijar el
+    # alias contaría en otra BD y guardaría el total con otra clave
+    qs = qs.using(qs.db)
+    threading.Thread(target=_refresh, args=(qs, key), daemon=True).start()
+
+
+def cached_count(qs):
+    """
+    Último total guardado de ``qs`` o ``None``; si tiene más de
+    ``ESTIMATED_COUNT_TTL`` segundos se devuelve igual y se recalcula en
+    segundo plano.
+    """
+    key = _count_key(qs)
+    entry = None if key is None else cache.get(key)
+    if entry is None:
+        return None
+    count, refreshed = entry
+    if time.time() - refreshed > _ttl():
+        _refresh_later(qs, key)
+    return count
+
+
+class EstimatedPage(Page):
+    """Página de un total estimado: ``has_next`` sale de la fila de más."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    ``Paginator`` que, a partir de ``ESTIMATED_COUNT_THRESHOLD`` filas,
+    no espera a un ``COUNT(*)``: usa ``estimated_count`` (PostgreSQL, sin
+    filtros) o el total cacheado de la misma consulta (``cached_count``).
+    Por debajo del umbral cuenta siempre. ``is_estimated`` indica si
+    ``count`` es aproximado; entonces las páginas no se recortan al total
+    y se admiten páginas más allá de la última calculada, por si el total
+    se ha quedado corto.
+    """
+    is_estimated = False
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if not isinstance(qs, QuerySet):
+            return super().count
+        threshold = getattr(settings, 'ESTIMATED_COUNT_THRESHOLD', 100000)
+        planner = estimated_count(qs)
+        estimate = planner if planner is not None else cached_count(qs)
+        if estimate is not None and estimate >= threshold:
+            self.is_estimated = True
+            return estimate
+        count = super().count
+        if planner is None and count >= threshold:
+            _store_count(qs, count)
+        return count
+
+    async def acount(self):
+        """Calcula ``count`` sin bloquear el bucle de eventos."""
+        return await sync_to_async(lambda: self.count)()
+
+    def validate_number(self, number):
+        if not self.count or not self.is_estimated:
+            return super().validate_number(number)
+        # Sin tope superior: el total estimado puede quedarse corto
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def _bounds(self, number):
+        bottom = (number - 1) * self.per_page
+        if self.is_estimated:
+            return bottom, bottom + self.per_page + 1
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        return bottom, top
+
+    def _make_page(self, rows, number):
+        if not self.is_estimated:
+            return self._get_page(rows, number, self)
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        # Lo leído es un mínimo del total: num_pages llega hasta aquí
+        seen = (number - 1) * self.per_page + len(rows)
+        if seen > self.count:
+            self.__dict__['count'] = seen
+            self.__dict__.pop('num_pages', None)
+        return EstimatedPage(rows[:self.per_page], number, self,
+                             len(rows) > self.per_page)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.is_estimated:
+            return super().page(number)
+        bottom, top = self._bounds(number)
+        return self._make_page(list(self.object_list[bottom:top]), number)
+
+    async def apage(self, number):
+        """Versión asíncrona de ``page``; antes hay que llamar a ``acount``."""
+        number = self.validate_number(number)
+        bottom, top = self._bounds(number)
+        rows = [obj async for obj in self.object_list[bottom:top]]
+        return self._make_page(rows, number)
@@ -0,0 +1,110 @@
+"""
+Pool de conexiones a la BD por proceso.
+
+Con ``CONN_MAX_AGE`` cada hilo mantiene su propia conexión persistente,
+pero las conexiones no se comparten entre hilos y cada una abierta de nuevo
+paga el establecimiento de la conexión y el TLS. El pool guarda las
+conexiones libres y las reparte entre las peticiones del proceso, con un
+máximo de ``max_size`` abiertas a la vez. Lo usa el backend
+``catalog.pooled_postgresql``.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """No se ha liberado ninguna conexión en el tiempo de espera."""
+
+
+class PoolStats:
+    """Contadores del pool; los tiempos en segundos."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.created = 0
+        self.discarded = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class ConnectionPool:
+    """
+    Pool de ``max_size`` conexiones como máximo.
+
+    ``acquire`` espera hasta ``timeout`` segundos a que quede un hueco,
+    reutiliza una conexión libre (descartándola si ``check`` devuelve
+    falso) o abre una nueva con ``connect``.
+    """
+
+    def __init__(self, max_size=4, timeout=10.0, check=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check = check
+        self.stats = PoolStats()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+    def _take_idle(self):
+        while True:
+            try:
+                connection = self._idle.pop()
+            except IndexError:
+                return None
+            if self.check is None or self.check(connection):
+                return connection
+            self._discard(connection)
+
+    def _discard(self, connection):
+        with self._lock:
+            self.stats.discarded += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def acquire(self, connect):
+        """
+        Devuelve ``(conexión, reutilizada, espera)``; la espera incluye el
+        tiempo de apertura si la conexión es nueva.
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self.stats.timeouts += 1
+            raise PoolTimeout(
+                f'No connection available after {self.timeout}s')
+        try:
+            connection = self._take_idle()
+            reused = connection is not None
+            if not reused:
+                connection = connect()
+        except BaseException:
+            self._slots.release()
+            raise
+        wait = time.perf_counter() - start
+        with self._lock:
+            self.stats.checkouts += 1
+            self.stats.created += not reused
+            self.stats.wait_total += wait
+            self.stats.wait_max = max(self.stats.wait_max, wait)
+        return connection, reused, wait
+
+    def release(self, connection, discard=False):
+        """Devuelve la conexión al pool, o la cierra si ``discard``."""
+        if discard:
+            self._discard(connection)
+        else:
+            self._idle.append(connection)
+        self._slots.release()
+
+    def close(self):
+        """Cierra las conexiones libres."""
+        while self._idle:
+            self._discard(self._idle.pop())
@@ -0,0 +1,89 @@
+"""
+Backend PostgreSQL que toma las conexiones de un ``ConnectionPool`` por
+proceso (ver ``catalog/pool.py``).
+
+Se configura en ``DATABASES`` con ``'ENGINE': 'catalog.pooled_postgresql'``
+y la clave ``POOL`` (``max_size``, ``timeout``). Al cerrar, Django devuelve
+la conexión al pool en lugar de cerrarla, así que ``CONN_MAX_AGE`` debe ser
+0. Con ``CONN_HEALTH_CHECKS`` las conexiones libres se comprueban antes de
+reutilizarlas.
+"""
+
+import os
+import threading
+
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from catalog.pool import ConnectionPool
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    """Pool del alias ``alias`` en este proceso (uno nuevo tras un fork)."""
+    key = (alias, os.getpid())
+    with _pools_lock:
+        if key not in _pools:
+            options = settings_dict.get('POOL', {})
+            check = None
+            if settings_dict['CONN_HEALTH_CHECKS']:
+                check = is_healthy
+            _pools[key] = ConnectionPool(
+                max_size=options.get('max_size', 4),
+                timeout=options.get('timeout', 10.0),
+                check=check)
+        return _pools[key]
+
+
+def is_healthy(connection):
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # Espera (s) de la última conexión tomada del pool
+    pool_wait = 0.0
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        def connect():
+            return super(DatabaseWrapper, self).get_new_connection(
+                conn_params)
+
+        connection, reused, self.pool_wait = self.pool.acquire(connect)
+        if reused:
+            level = self.settings_dict['OPTIONS'].get(
+                'isolation_level', IsolationLevel.READ_COMMITTED)
+            self.isolation_level = IsolationLevel(level)
+        return connection
+
+    def _close(self):
+        connection = self.connection
+        if connection is None:
+            return
+        discard = bool(connection.closed)
+        idle = base.Database.extensions.TRANSACTION_STATUS_IDLE
+        if not discard:
+            try:
+                if connection.info.transaction_status != idle:
+                    connection.rollback()
+                # Sin autocommit, la comprobación de salud (SELECT 1) de la
+                # siguiente petición abriría una transacción antes de que
+                # Django lo active
+                if not connection.autocommit:
+                    connection.autocommit = True
+            except base.Database.Error:
+                discard = True
+        self.pool.release(connection, discard)
@@ -0,0 +1,50 @@
+"""
+Enrutado de lecturas a la réplica de la BD.
+
+``ReplicaMiddleware`` (``catalog/middleware.py``) activa ``use_replica``
+mientras atiende una petición de lectura a una vista marcada con
+``use_replica = True`` (o ``@reads_from_replica``); en ese caso las
+lecturas de los modelos del catálogo van al alias ``replica``. Todo lo
+demás (escrituras, transacciones, sesiones, usuarios, admin) va a la
+primaria.
+"""
+
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA_ALIAS = 'replica'
+
+use_replica = ContextVar('catalog_use_replica', default=False)
+
+
+def reads_from_replica(view):
+    """Marca una vista de función como de solo lectura."""
+    view.use_replica = True
+    return view
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not use_replica.get() or model._meta.app_label != 'catalog':
+            return None
+        # Dentro de una transacción se lee lo que se acaba de escribir
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        dbs = {DEFAULT_DB_ALIAS, REPLICA_ALIAS}
+        if obj1._state.db in dbs and obj2._state.db in dbs:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # La réplica se actualiza por replicación
+        if db == REPLICA_ALIAS:
+            return False
+        return None
@@ -0,0 +1,80 @@
+"""
+Búsqueda de libros por título, resumen, ISBN y nombre del autor.
+
+En PostgreSQL se usa búsqueda de texto completo sobre la columna
+``Book.search_vector`` (con índice GIN, ver la migración 0010), ordenando
+por relevancia. En el resto de motores (p.ej. SQLite en los tests) se
+recurre a ``icontains`` ordenado por título.
+"""
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector,
+)
+from django.db import connections
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Concat
+
+from .models import Author, Book
+
+
+CONFIG = 'simple'  # Catálogo multilingüe: sin stemming de un idioma
+
+
+def uses_full_text(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def search_document():
+    """Expresión del ``tsvector`` de un libro (misma que la migración)."""
+    author = Author.objects.filter(pk=OuterRef('author_id'))
+    name = author.annotate(
+        name=Concat('first_name', Value(' '), 'last_name')).values('name')
+    return (
+        SearchVector('title', weight='A', config=CONFIG)
+        + SearchVector(Subquery(name), weight='A', config=CONFIG)
+        + SearchVector('isbn', weight='A', config=CONFIG)
+        + SearchVector('summary', weight='B', config=CONFIG)
+    )
+
+
+def update_search_vector(queryset=None):
+    """
+    Recalcula ``search_vector`` de los libros de ``queryset`` con un único
+    UPDATE. No hace nada fuera de PostgreSQL.
+    """
+    if queryset is None:
+        queryset = Book.objects.all()
+    if not uses_full_text(queryset):
+        return 0
+    return queryset.update(search_vector=search_document())
+
+
+def search_books(text, queryset=None):
+    """Libros que casan con ``text``, los más relevantes primero."""
+    if queryset is None:
+        queryset = Book.objects.all()
+    queryset = queryset.select_related('author')
+    if uses_full_text(queryset):
+        query = SearchQuery(text, config=CONFIG, search_type='websearch')
+        rank = SearchRank(F('search_vector'), query)
+        return queryset.filter(search_vector=query).annotate(
+            rank=rank).order_by('-rank', 'title', 'pk')
+    return queryset.filter(
+        Q(title__icontains=text)
+        | Q(summary__icontains=text)
+        | Q(isbn__iexact=text)
+        | Q(author__first_name__icontains=text)
+        | Q(author__last_name__icontains=text)
+    ).order_by('title', 'pk')
+
+
+def book_saved(sender, instance, raw=False, **kwargs):
+    """Receptor de ``post_save`` de ``Book``."""
+    if not raw:
+        update_search_vector(Book.objects.filter(pk=instance.pk))
+
+
+def author_saved(sender, instance, raw=False, **kwargs):
+    """Receptor de ``post_save`` de ``Author``: reindexa sus libros."""
+    if not raw:
+        update_search_vector(Book.objects.filter(author=instance))
@@ -0,0 +1,68 @@
+"""
+Receptores de señales del catálogo.
+
+Se conectan desde ``CatalogConfig.ready``.
+"""
+
+from django.contrib.auth.models import Group, Permission, User
+from django.db.models.signals import (
+    post_save, post_delete, pre_delete, m2m_changed)
+
+from . import conditional
+from .backends import invalidate_perms, perms_m2m_changed, user_saved
+from .models import Book, BookInstance, Author, Genre, Language
+from . import pagecache
+from .search import book_saved, author_saved
+from .overdue import invalidate_overdue_count
+from .stats import invalidate_stats
+
+
+for model in (Book, BookInstance, Author, Genre):
+    uid = f'catalog-stats-{model._meta.model_name}'
+    post_save.connect(invalidate_stats, sender=model, dispatch_uid=uid)
+    post_delete.connect(invalidate_stats, sender=model, dispatch_uid=uid)
+
+post_save.connect(invalidate_overdue_count, sender=BookInstance,
+                  dispatch_uid='catalog-overdue-bookinstance')
+post_delete.connect(invalidate_overdue_count, sender=BookInstance,
+                    dispatch_uid='catalog-overdue-bookinstance')
+
+post_save.connect(book_saved, sender=Book, dispatch_uid='catalog-search-book')
+post_save.connect(author_saved, sender=Author,
+                  dispatch_uid='catalog-search-author')
+
+m2m_changed.connect(conditional.genres_changed, sender=Book.genre.through,
+                    dispatch_uid='catalog-conditional-book-genre')
+# Antes de borrar: después ya no se sabe qué libros los usaban
+for model, receiver in ((Genre, conditional.genre_changed),
+                        (Language, conditional.language_changed)):
+    uid = f'catalog-conditional-{model._meta.model_name}'
+    post_save.connect(receiver, sender=model, dispatch_uid=uid)
+    pre_delete.connect(receiver, sender=model, dispatch_uid=uid)
+
+# Caché de páginas
+for model, receiver in ((Book, pagecache.book_changed),
+                        (Author, pagecache.author_changed),
+                        (Genre, pagecache.genre_changed),
+                        (Language, pagecache.language_changed)):
+    uid = f'catalog-pages-{model._meta.model_name}'
+    post_save.connect(receiver, sender=model, dispatch_uid=uid)
+    post_delete.connect(receiver, sender=model, dispatch_uid=uid)
+post_save.connect(pagecache.copy_saved, sender=BookInstance,
+                  dispatch_uid='catalog-pages-bookinstance')
+post_delete.connect(pagecache.copy_deleted, sender=BookInstance,
+                    dispatch_uid='catalog-pages-bookinstance')
+m2m_changed.connect(pagecache.book_genres_changed, sender=Book.genre.through,
+                    dispatch_uid='catalog-pages-book-genre')
+
+post_save.connect(user_saved, sender=User, dispatch_uid='catalog-perms-user')
+post_delete.connect(invalidate_perms, sender=User,
+                    dispatch_uid='catalog-perms-user')
+for through in (User.groups.through, User.user_permissions.through,
+                Group.permissions.through):
+    m2m_changed.connect(perms_m2m_changed, sender=through,
+                        dispatch_uid=f'catalog-perms-{through.__name__}')
+for model in (Group, Permission):
+    uid = f'catalog-perms-{model._meta.model_name}'
+    post_save.connect(invalidate_perms, sender=model, dispatch_uid=uid)
+    post_delete.connect(invalidate_perms, sender=model, dispatch_uid=uid)
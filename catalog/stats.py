@@ -0,0 +1,99 @@
+"""
+Contadores agregados de la página de inicio del catálogo.
+
+Todos los contadores se calculan en una única consulta y se guardan en la
+caché; las señales de ``catalog.signals`` y las operaciones masivas de
+``BookInstanceQuerySet`` invalidan la entrada cuando se guarda o borra
+alguno de los modelos implicados. Con ``LocMemCache`` la invalidación solo
+llega al proceso que hizo el cambio, así que ahí la entrada caduca a los
+``STATS_LOCAL_TIMEOUT`` segundos.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, Func, IntegerField
+
+from .models import Book, Author, Genre
+from .models import BookInstance as BII
+
+
+STATS_CACHE_KEY = 'catalog:index-stats'
+STATS_TIMEOUT = None  # Sin caducidad: se invalida con las señales
+STATS_LOCAL_TIMEOUT = 60
+# Leídos de la réplica pueden llegar con retraso: caducan a los 60 s
+REPLICA_STATS_TIMEOUT = 60
+WORD = 'a'
+
+
+def _counters():
+    """Pares (nombre, queryset) de cada contador de la página de inicio."""
+    return (
+        ('num_books', Book.objects.all()),
+        ('num_instances', BII.objects.all()),
+        ('num_instances_available', BII.objects.filter(status__exact='a')),
+        ('num_authors', Author.objects.all()),
+        ('num_genres', Genre.objects.all()),
+        ('num_books_containing_word',
+         Book.objects.filter(title__icontains=WORD)),
+    )
+
+
+def _count_sql(qs):
+    """
+    SQL de un ``COUNT`` escalar sobre ``qs`` (sin GROUP BY ni ORDER BY).
+    """
+    n = Func(F('pk'), function='COUNT', output_field=IntegerField())
+    query = qs.order_by().annotate(n=n).values('n').query
+    return query.get_compiler(using=qs.db).as_sql()
+
+
+def compute_stats():
+    """
+    Calcula todos los contadores en una sola ida y vuelta a la BD.
+
+    Cada contador es una subconsulta escalar dentro de un único SELECT.
+    """
+    counters = _counters()
+    parts, params = [], []
+    for name, qs in counters:
+        sql, p = _count_sql(qs)
+        parts.append(f'({sql})')
+        params.extend(p)
+    using = counters[0][1].db
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT ' + ', '.join(parts), params)
+        row = cursor.fetchone()
+    return {name: value or 0 for (name, _), value in zip(counters, row)}
+
+
+def _timeout():
+    if Book.objects.all().db != DEFAULT_DB_ALIAS:
+        return REPLICA_STATS_TIMEOUT
+    if isinstance(caches['default'], LocMemCache):
+        return STATS_LOCAL_TIMEOUT
+    return STATS_TIMEOUT
+
+
+def get_stats():
+    """Devuelve los contadores desde la caché, calculándolos si hace falta."""
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_stats()
+        cache.set(STATS_CACHE_KEY, stats, _timeout())
+    return stats
+
+
+async def aget_stats():
+    """Versión asíncrona de ``get_stats``."""
+    stats = await cache.aget(STATS_CACHE_KEY)
+    if stats is None:
+        stats = await sync_to_async(compute_stats)()
+        await cache.aset(STATS_CACHE_KEY, stats, _timeout())
+    return stats
+
+
+def invalidate_stats(**kwargs):
+    """Receptor de señales: descarta los contadores cacheados."""
+    cache.delete(STATS_CACHE_KEY)
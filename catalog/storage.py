@@ -0,0 +1,81 @@
+"""
+Almacenamiento de los estáticos (``STATICFILES_STORAGE``).
+
+El de WhiteNoise ya guarda cada fichero con el hash de su contenido en el
+nombre y le añade variantes ``.gz`` y, con Brotli instalado, ``.br``; el
+middleware de WhiteNoise sirve los ficheros con hash con
+``Cache-Control: max-age=315360000, public, immutable``. Aquí se añaden
+los paquetes de ``BUNDLES``: varias hojas CSS unidas y minificadas en una
+sola durante ``collectstatic``, que después se trata como cualquier otro
+fichero. Las hojas de un paquete no deben usar ``url()`` relativas.
+"""
+
+import re
+
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+BUNDLES = {
+    'css/catalog.min.css': (
+        'vendor/bootstrap/bootstrap.min.css',
+        'css/styles.css',
+        'css/frontpage-styles.css',
+    ),
+}
+
+# Cadenas (que no se tocan) y comentarios
+_TOKENS = re.compile(
+    r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)''', re.S)
+
+
+def _minify_code(css):
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    # Tras ':' nunca hace falta el espacio; antes sí (``a :hover``)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}')
+
+
+def minify_css(css):
+    """
+    Quita comentarios (salvo las licencias, ``/*! ... */``) y espacios
+    innecesarios, sin modificar las cadenas entre comillas.
+    """
+    parts, pos, after_comment = [], 0, False
+    for match in _TOKENS.finditer(css):
+        code = _minify_code(css[pos:match.start()])
+        if after_comment:
+            code = code.lstrip()
+        string, comment = match.groups()
+        after_comment = string is None
+        if string:
+            parts.append(code + string)
+        else:
+            # Los espacios junto a un comentario sobran
+            parts.append(code.rstrip())
+            if comment.startswith('/*!'):
+                parts.append(comment)
+        pos = match.end()
+    code = _minify_code(css[pos:])
+    parts.append(code.lstrip() if after_comment else code)
+    return ''.join(parts).strip()
+
+
+class CatalogStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name, sources in BUNDLES.items():
+                self._build_bundle(name, sources, paths)
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run, **options)
+
+    def _build_bundle(self, name, sources, paths):
+        css = []
+        for source in sources:
+            storage, path = paths[source]
+            with storage.open(path) as f:
+                css.append(f.read().decode())
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(minify_css('\n'.join(css)).encode()))
@@ -0,0 +1,147 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Author, Book, BookInstance, Genre, Language
+from catalog.paginators import EstimatedCountPaginator, estimated_count
+
+
+class AdminPerformanceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_superuser('admin', 'a@example.com', 'pw12345678')
+        cls.author = Author.objects.create(first_name='Ana',
+                                           last_name='Matute')
+        cls.genres = [Genre.objects.create(name=f'G{i}') for i in range(4)]
+        cls.language = Language.objects.create(name='Spanish')
+        cls.book = Book.objects.create(title='Book', summary='s', isbn='1',
+                                       author=cls.author,
+                                       language=cls.language)
+        cls.book.genre.set(cls.genres)
+        cls.borrower = User.objects.create_user('reader')
+        BookInstance.objects.bulk_create(
+            BookInstance(book=cls.book, imprint=f'i{i:02}', status='o',
+                         borrower=cls.borrower)
+            for i in range(25))
+
+    def setUp(self):
+        self.client.login(username='admin', password='pw12345678')
+
+    def add_books(self, n):
+        for i in range(n):
+            author = Author.objects.create(first_name=f'A{i}',
+                                           last_name='B')
+            book = Book.objects.create(title=f'More {i}', summary='s',
+                                       isbn='1', author=author)
+            book.genre.set(self.genres)
+            BookInstance.objects.create(book=book, imprint='i',
+                                        borrower=self.borrower)
+
+    def count_queries(self, url):
+        self.client.get(url)  # Permisos y contadores ya cacheados
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def test_changelists_constant_queries(self):
+        urls = [reverse(f'admin:catalog_{name}_changelist')
+                for name in ('book', 'bookinstance', 'author')]
+        before = [self.count_queries(url) for url in urls]
+        self.add_books(10)
+        self.assertEqual([self.count_queries(url) for url in urls], before)
+
+    def test_display_genre_uses_prefetch(self):
+        response = self.client.get(reverse('admin:catalog_book_changelist'))
+        self.assertContains(response, 'G0, G1, G2')
+        self.assertNotContains(response, 'G3')
+
+    def test_display_genre_without_prefetch(self):
+        book = Book.objects.get(pk=self.book.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(book.display_genre(), 'G0, G1, G2')
+        self.assertEqual(len(ctx), 1)
+        self.assertIn('LIMIT 3', ctx[0]['sql'])
+
+    def test_inline_is_paginated(self):
+        url = reverse('admin:catalog_book_change', args=[self.book.pk])
+        response = self.client.get(url)
+        formset = response.context['inline_admin_formsets'][0].formset
+        self.assertEqual(formset.initial_form_count(), 20)
+        self.assertContains(response, 'bookinstance_set-page=2')
+
+        first = {f.instance.pk for f in formset.forms}
+        response = self.client.get(url, {'bookinstance_set-page': 2})
+        formset = response.context['inline_admin_formsets'][0].formset
+        second = {f.instance.pk for f in formset.forms}
+        self.assertEqual(len(second), 5)
+        self.assertFalse(first & second)
+
+    def test_inline_queries_do_not_grow_with_copies(self):
+        url = reverse('admin:catalog_book_change', args=[self.book.pk])
+        BookInstance.objects.filter(imprint__gte='i05').delete()
+        few = self.count_queries(url)
+        BookInstance.objects.bulk_create(
+            BookInstance(book=self.book, imprint=f'j{i}', status='o',
+                         borrower=self.borrower)
+            for i in range(15))
+        self.assertEqual(self.count_queries(url), few)
+
+    def inline_post_data(self, formset):
+        data = {
+            'title': 'Book', 'author': self.author.pk, 'summary': 's',
+            'isbn': '1', 'language': self.language.pk,
+            'genre': [g.pk for g in self.genres],
+        }
+        prefix = formset.prefix
+        data.update({
+            f'{prefix}-TOTAL_FORMS': len(formset.forms),
+            f'{prefix}-INITIAL_FORMS': len(formset.forms),
+        })
+        for i, form in enumerate(formset.forms):
+            copy = form.instance
+            data.update({
+                f'{prefix}-{i}-id': copy.pk,
+                f'{prefix}-{i}-book': self.book.pk,
+                f'{prefix}-{i}-imprint': copy.imprint + '!',
+                f'{prefix}-{i}-status': 'o',
+                f'{prefix}-{i}-borrower': self.borrower.pk,
+            })
+        return data
+
+    def test_save_second_page(self):
+        url = reverse('admin:catalog_book_change', args=[self.book.pk])
+        url += '?bookinstance_set-page=2'
+        response = self.client.get(url)
+        formset = response.context['inline_admin_formsets'][0].formset
+        response = self.client.post(url, self.inline_post_data(formset))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            BookInstance.objects.filter(imprint__endswith='!').count(), 5)
+
+    def test_save_page_after_rows_moved(self):
+        url = reverse('admin:catalog_book_change', args=[self.book.pk])
+        url += '?bookinstance_set-page=2'
+        response = self.client.get(url)
+        formset = response.context['inline_admin_formsets'][0].formset
+        edited = {f.instance.pk for f in formset.forms}
+        # Las filas de la segunda página pasan a la primera
+        others = BookInstance.objects.exclude(pk__in=edited)
+        moved = list(others.values_list('pk', flat=True)[:3])
+        BookInstance.objects.filter(pk__in=moved).delete()
+        response = self.client.post(url, self.inline_post_data(formset))
+        self.assertEqual(response.status_code, 302)
+        saved = BookInstance.objects.filter(imprint__endswith='!')
+        self.assertEqual({copy.pk for copy in saved}, edited)
+        self.assertEqual(BookInstance.objects.count(), 22)
+
+    def test_estimated_count_falls_back_to_count(self):
+        qs = Book.objects.all()
+        if connection.vendor != 'postgresql':
+            self.assertIsNone(estimated_count(qs))
+        self.assertIsNone(estimated_count(qs.filter(title='Book')))
+        paginator = EstimatedCountPaginator(qs.filter(title='Book'), 10)
+        self.assertEqual(paginator.count, 1)
+        self.assertFalse(paginator.is_estimated)
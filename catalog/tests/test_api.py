@@ -0,0 +1,126 @@
+import json
+
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.models import Author, Book, BookInstance, Genre
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(first_name='Ana',
+                                           last_name='Matute')
+        fantasy = Genre.objects.create(name='Fantasy')
+        horror = Genre.objects.create(name='Horror')
+        cls.books = []
+        for i in range(7):
+            book = Book.objects.create(title=f'Book {i}', summary='s',
+                                       isbn=str(i), author=cls.author)
+            book.genre.set([fantasy, horror][:i % 3])
+            cls.books.append(book)
+        cls.librarian = User.objects.create_user('librarian',
+                                                 password='pw12345678')
+        cls.librarian.user_permissions.add(
+            Permission.objects.get(codename='can_mark_returned'),
+            Permission.objects.get(codename='add_author'))
+        cls.copy = BookInstance.objects.create(
+            book=cls.books[0], imprint='i', status='o',
+            borrower=cls.librarian)
+
+    def get(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        return response.status_code, json.loads(response.content)
+
+    def test_sparse_fields(self):
+        status, data = self.get('api-books', fields='id,title,genres',
+                                ids=self.books[2].pk)
+        self.assertEqual(status, 200)
+        genres = list(self.books[2].genre.values_list('pk', flat=True))
+        self.assertEqual(data['results'], [
+            {'id': self.books[2].pk, 'title': 'Book 2', 'genres': genres}])
+
+        status, data = self.get('api-books', fields='title,nope')
+        self.assertEqual(status, 400)
+        self.assertIn('nope', data['error'])
+
+    def test_ids_lookup(self):
+        ids = [self.books[1].pk, self.books[5].pk]
+        status, data = self.get('api-books', fields='id',
+                                ids=','.join(map(str, ids)))
+        self.assertEqual([b['id'] for b in data['results']], ids)
+        self.assertEqual(self.get('api-books', ids='x')[0], 400)
+
+    def test_cursor_pagination(self):
+        seen, params = [], {'fields': 'id', 'limit': 3}
+        url = reverse('api-books')
+        while url:
+            data = json.loads(self.client.get(url, params).content)
+            seen += [b['id'] for b in data['results']]
+            url, params = data['next'], {}
+        self.assertEqual(seen, [b.pk for b in self.books])
+        self.assertEqual(self.get('api-books', cursor='bad')[0], 400)
+
+    def test_fixed_number_of_queries(self):
+        for ids in ([self.books[0].pk], [b.pk for b in self.books]):
+            with self.assertNumQueries(2):  # Libros + géneros
+                self.client.get(reverse('api-books'), {
+                    'ids': ','.join(map(str, ids))})
+
+    def test_streaming(self):
+        response = self.client.get(reverse('api-books'),
+                                   {'stream': '1', 'fields': 'id,genres'})
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([b['id'] for b in data],
+                         [b.pk for b in self.books])
+        self.assertEqual(data[1]['genres'],
+                         list(self.books[1].genre.values_list(
+                             'pk', flat=True)))
+
+    def test_detail_and_filters(self):
+        response = self.client.get(
+            reverse('api-copies-detail', args=[self.copy.pk]))
+        data = json.loads(response.content)
+        self.assertEqual(data['status'], 'o')
+        self.assertEqual(data['book'], self.books[0].pk)
+        status, data = self.get('api-copies', book=self.books[1].pk)
+        self.assertEqual(data['results'], [])
+        response = self.client.get(reverse('api-authors-detail', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_borrower_requires_permission(self):
+        status, data = self.get('api-copies')
+        self.assertNotIn('borrower', data['results'][0])
+        self.assertEqual(self.get('api-copies', fields='borrower')[0], 400)
+        self.client.login(username='librarian', password='pw12345678')
+        status, data = self.get('api-copies')
+        self.assertEqual(data['results'][0]['borrower'], self.librarian.pk)
+
+    def test_create_author_requires_permission(self):
+        url = reverse('api-authors')
+        body = json.dumps({'first_name': 'Carmen', 'last_name': 'Laforet'})
+        response = self.client.post(url, body,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username='librarian', password='pw12345678')
+        response = self.client.post(url, body,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(json.loads(response.content)['last_name'],
+                         'Laforet')
+        response = self.client.post(url, '{}',
+                                    content_type='application/json')
+        self.assertIn('first_name', json.loads(response.content)['errors'])
+        for body in ('not json', '[]', '"x"', '1', 'null'):
+            response = self.client.post(url, body,
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(json.loads(response.content),
+                             {'error': 'Invalid JSON'})
+
+        response = self.client.post(reverse('api-books'), body,
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 405)
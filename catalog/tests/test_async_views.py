@@ -0,0 +1,79 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase
+
+from catalog import async_views
+from catalog.models import Author, Book
+
+
+class AsyncViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(first_name='Ana',
+                                           last_name='Matute')
+        for i in range(5):
+            Book.objects.create(title=f'Book {i}', summary='s',
+                                isbn=str(i), author=cls.author)
+
+    def request(self, path, **params):
+        request = AsyncRequestFactory().get(path, params)
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        return request
+
+    async def call(self, view, request, **kwargs):
+        response = await view(request, **kwargs)
+        await sync_to_async(response.render)()
+        return response
+
+    async def test_index(self):
+        request = self.request('/catalog/')
+        response = await self.call(async_views.index, request)
+        self.assertEqual(response.context_data['num_books'], 5)
+        self.assertEqual(response.context_data['num_visits'], 0)
+        self.assertEqual(request.session['num_visits'], 1)
+
+    async def test_book_list_offset_pages(self):
+        view = async_views.BookListView.as_view()
+        response = await self.call(view, self.request('/', page=3))
+        page = response.context_data['page_obj']
+        self.assertEqual(page.number, 3)
+        self.assertEqual(page.paginator.num_pages, 3)
+        self.assertEqual([b.title for b in page], ['Book 4'])
+        self.assertContains(response, 'Page 3 of 3')
+
+        with self.assertRaises(Http404):
+            await view(self.request('/', page=4))
+
+    async def test_author_list_cursor_pages(self):
+        for i in range(3):
+            await Author.objects.acreate(first_name=f'N{i}', last_name='L')
+        view = async_views.AuthorListView.as_view()
+        response = await self.call(view, self.request('/', cursor=''))
+        page = response.context_data['page_obj']
+        self.assertTrue(page.is_keyset)
+        self.assertEqual(len(page), 3)
+        self.assertTrue(page.has_next())
+
+        response = await self.call(
+            view, self.request('/', cursor=page.next_cursor))
+        self.assertEqual(len(response.context_data['page_obj']), 1)
+
+        with self.assertRaises(Http404):
+            await view(self.request('/', cursor='bogus'))
+
+    async def test_detail_views(self):
+        book = await Book.objects.afirst()
+        view = async_views.BookDetailView.as_view()
+        response = await self.call(view, self.request('/'), pk=book.pk)
+        self.assertContains(response, book.title)
+
+        view = async_views.AuthorDetailView.as_view()
+        response = await self.call(view, self.request('/'),
+                                   pk=self.author.pk)
+        self.assertEqual(len(response.context_data['book_list']), 5)
+
+        with self.assertRaises(Http404):
+            await view(self.request('/'), pk=self.author.pk + 100)
@@ -0,0 +1,96 @@
+import json
+
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.models import Author, Book, Genre, Language
+
+
+class AutocompleteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            Author.objects.create(first_name=f'Ana {i:02}', last_name='Matute')
+            for i in range(25)
+        ]
+        cls.other = Author.objects.create(first_name='Benito',
+                                          last_name='Pérez Galdós')
+        cls.genre = Genre.objects.create(name='Fantasy')
+        Genre.objects.create(name='Horror')
+        cls.language = Language.objects.create(name='Spanish')
+        cls.book = Book.objects.create(title='Dracula', summary='s',
+                                       isbn='1', author=cls.other,
+                                       language=cls.language)
+        cls.book.genre.add(cls.genre)
+        cls.librarian = User.objects.create_user('librarian',
+                                                 password='pw12345678')
+        cls.librarian.user_permissions.add(
+            Permission.objects.get(codename='can_mark_returned'))
+
+    def get(self, source, **params):
+        response = self.client.get(reverse('autocomplete', args=[source]),
+                                   params)
+        return response.status_code, json.loads(response.content)
+
+    def test_prefix_search(self):
+        status, data = self.get('authors', q='pér')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['results'], [
+            {'id': self.other.pk, 'text': 'Pérez Galdós, Benito'}])
+        self.assertEqual(self.get('authors', q='benito')[1]['results'][0]
+                         ['id'], self.other.pk)
+        self.assertEqual(self.get('genres', q='alde')[1]['results'], [])
+
+    def test_pagination(self):
+        status, data = self.get('authors', q='ana')
+        self.assertEqual(len(data['results']), 20)
+        self.assertTrue(data['pagination']['more'])
+        status, data = self.get('authors', q='ana', page=2)
+        self.assertEqual([r['id'] for r in data['results']],
+                         [a.pk for a in self.authors[20:]])
+        self.assertFalse(data['pagination']['more'])
+
+    def test_users_require_permission(self):
+        self.assertEqual(
+            self.client.get(reverse('autocomplete', args=['users'])
+                            ).status_code, 403)
+        self.client.login(username='librarian', password='pw12345678')
+        status, data = self.get('users', q='lib')
+        self.assertEqual(data['results'], [
+            {'id': self.librarian.pk, 'text': 'librarian'}])
+        response = self.client.get(reverse('autocomplete', args=['nope']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_book_form_renders_selected_options_only(self):
+        self.client.login(username='librarian', password='pw12345678')
+        response = self.client.get(reverse('book-update',
+                                           args=[self.book.pk]))
+        self.assertContains(response, 'data-autocomplete-url="%s"'
+                            % reverse('autocomplete', args=['authors']))
+        self.assertContains(response, 'Pérez Galdós, Benito')
+        self.assertContains(response, 'Fantasy')
+        self.assertNotContains(response, 'Matute')
+        self.assertNotContains(response, 'Horror')
+
+        response = self.client.post(reverse('book-update',
+                                            args=[self.book.pk]), {
+            'title': 'Dracula', 'summary': 's', 'isbn': '1',
+            'author': self.authors[0].pk, 'genre': [self.genre.pk],
+            'language': self.language.pk})
+        self.assertEqual(response.status_code, 302)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.author, self.authors[0])
+
+    def test_admin_autocomplete(self):
+        User.objects.create_superuser('admin', 'a@example.com', 'pw12345678')
+        self.client.login(username='admin', password='pw12345678')
+        response = self.client.get(reverse('admin:catalog_book_change',
+                                           args=[self.book.pk]))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'Matute')
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'catalog', 'model_name': 'bookinstance',
+            'field_name': 'borrower', 'term': 'lib'})
+        self.assertEqual(json.loads(response.content)['results'][0]['text'],
+                         'librarian')
@@ -0,0 +1,108 @@
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Book, BookInstance
+
+
+class AvailabilityCountersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(title='Book', summary='s', isbn='1')
+        cls.other = Book.objects.create(title='Other', summary='s', isbn='2')
+
+    def counters(self, book):
+        book.refresh_from_db()
+        return (book.copies_total, book.copies_available,
+                book.copies_on_loan, book.copies_reserved,
+                book.copies_maintenance)
+
+    def test_save_and_delete(self):
+        copy = BookInstance.objects.create(book=self.book, status='a')
+        self.assertEqual(self.counters(self.book), (1, 1, 0, 0, 0))
+        copy.status = 'o'
+        copy.save()
+        self.assertEqual(self.counters(self.book), (1, 0, 1, 0, 0))
+        copy.book = self.other
+        copy.save()
+        self.assertEqual(self.counters(self.book), (0, 0, 0, 0, 0))
+        self.assertEqual(self.counters(self.other), (1, 0, 1, 0, 0))
+        copy.delete()
+        self.assertEqual(self.counters(self.other), (0, 0, 0, 0, 0))
+
+    def test_save_without_status_change_does_not_recount(self):
+        copy = BookInstance.objects.create(book=self.book, status='o')
+        copy = BookInstance.objects.get(pk=copy.pk)
+        copy.imprint = 'New'
+        # SAVEPOINT, UPDATE y RELEASE, sin recuento
+        with self.assertNumQueries(3):
+            copy.save()
+
+    def test_bulk_operations(self):
+        BookInstance.objects.bulk_create(
+            [BookInstance(book=self.book, status='a') for _ in range(3)]
+            + [BookInstance(book=self.other, status='r')])
+        self.assertEqual(self.counters(self.book), (3, 3, 0, 0, 0))
+        BookInstance.objects.filter(book=self.book).update(status='m')
+        self.assertEqual(self.counters(self.book), (3, 0, 0, 0, 3))
+        BookInstance.objects.filter(status='r').delete()
+        self.assertEqual(self.counters(self.other), (0, 0, 0, 0, 0))
+
+    def test_bulk_update_moving_copies(self):
+        copies = BookInstance.objects.bulk_create(
+            [BookInstance(book=self.book, status='a') for _ in range(2)])
+        for copy in copies:
+            copy.book_id = self.other.pk
+        BookInstance.objects.bulk_update(copies, ['book_id'])
+        self.assertEqual(self.counters(self.book), (0, 0, 0, 0, 0))
+        self.assertEqual(self.counters(self.other), (2, 2, 0, 0, 0))
+
+    @mock.patch('catalog.models.REFRESH_BATCH', 2)
+    def test_bulk_operations_recount_in_batches(self):
+        books = [self.book, self.other] + [
+            Book.objects.create(title=f'Book {i}', summary='s', isbn='3')
+            for i in range(3)]
+        BookInstance.objects.bulk_create(
+            [BookInstance(book=book, status='a') for book in books])
+        BookInstance.objects.all().update(status='o')
+        for book in books:
+            self.assertEqual(self.counters(book), (1, 0, 1, 0, 0))
+        BookInstance.objects.all().delete()
+        for book in books:
+            self.assertEqual(self.counters(book), (0, 0, 0, 0, 0))
+
+    def test_book_save_keeps_counters(self):
+        book = Book.objects.get(pk=self.book.pk)
+        BookInstance.objects.create(book=self.book, status='a')
+        book.title = 'Renamed'
+        book.save()
+        self.assertEqual(self.counters(self.book), (1, 1, 0, 0, 0))
+
+    @mock.patch('catalog.models.REFRESH_BATCH', 2)
+    def test_reconcile_command_repairs_in_batches(self):
+        books = [Book.objects.create(title=f'Book {i}', summary='s',
+                                     isbn='3') for i in range(5)]
+        Book.objects.update(copies_total=3)
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('reconcile_availability', stdout=io.StringIO())
+        updates = [q['sql'] for q in ctx if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 4)  # 7 libros
+        for book in books:
+            self.assertEqual(self.counters(book), (0, 0, 0, 0, 0))
+
+    def test_reconcile_command(self):
+        BookInstance.objects.create(book=self.book, status='a')
+        Book.objects.filter(pk=self.book.pk).update(copies_available=7)
+        out = io.StringIO()
+        call_command('reconcile_availability', dry_run=True, stdout=out)
+        self.assertIn('1 books with drifted counters', out.getvalue())
+        self.assertEqual(self.counters(self.book), (1, 7, 0, 0, 0))
+        call_command('reconcile_availability', stdout=out)
+        self.assertEqual(self.counters(self.book), (1, 1, 0, 0, 0))
+        out = io.StringIO()
+        call_command('reconcile_availability', stdout=out)
+        self.assertIn('No drift found', out.getvalue())
@@ -0,0 +1,75 @@
+import tempfile
+
+from django.contrib.auth.models import Group, Permission, User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.backends import (PERMS_LOCAL_TIMEOUT, PERMS_TIMEOUT,
+                              perms_timeout)
+
+
+class CachedPermissionsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('staff', password='pw',
+                                             is_staff=True)
+        self.add_author = Permission.objects.get(codename='add_author')
+        self.add_book = Permission.objects.get(codename='add_book')
+        self.user.user_permissions.add(self.add_author)
+        self.client.login(username='staff', password='pw')
+
+    def get_index(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('index'))
+        perm_queries = [q for q in ctx if 'auth_permission' in q['sql']]
+        return response, perm_queries
+
+    def test_permissions_are_cached_between_requests(self):
+        response, queries = self.get_index()
+        self.assertTrue(queries)
+        self.assertContains(response, 'Create author')
+        response, queries = self.get_index()
+        self.assertEqual(queries, [])
+        self.assertContains(response, 'Create author')
+
+    def test_user_permission_change_invalidates(self):
+        response, _ = self.get_index()
+        self.assertNotContains(response, 'Create book')
+        self.user.user_permissions.add(self.add_book)
+        response, _ = self.get_index()
+        self.assertContains(response, 'Create book')
+
+    def test_group_permission_change_invalidates(self):
+        group = Group.objects.create(name='Librarians')
+        self.user.groups.add(group)
+        response, _ = self.get_index()
+        self.assertNotContains(response, 'Create book')
+        group.permissions.add(self.add_book)
+        response, _ = self.get_index()
+        self.assertContains(response, 'Create book')
+        self.user.user_permissions.remove(self.add_author)
+        response, _ = self.get_index()
+        self.assertNotContains(response, 'Create author')
+
+    def test_sidebar_fragment_depends_on_user(self):
+        self.get_index()
+        self.client.logout()
+        response, _ = self.get_index()
+        self.assertNotContains(response, 'Staff')
+        self.assertContains(response, 'Login </button>')
+
+    def test_sidebar_links_follow_the_current_page(self):
+        self.get_index()
+        response = self.client.get(reverse('books'))
+        self.assertContains(response, f"?next={reverse('books')}")
+        self.assertContains(response, 'Create author')
+
+    def test_process_local_cache_keeps_permissions_briefly(self):
+        self.assertEqual(perms_timeout(), PERMS_LOCAL_TIMEOUT)
+        with tempfile.TemporaryDirectory() as location:
+            with override_settings(CACHES={'default': {
+                    'BACKEND': 'django.core.cache.backends.filebased.'
+                               'FileBasedCache',
+                    'LOCATION': location}}):
+                self.assertEqual(perms_timeout(), PERMS_TIMEOUT)
@@ -0,0 +1,177 @@
+import datetime as dt
+from unittest import mock
+
+from django.contrib.auth.models import Permission, User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog import conditional
+from catalog.models import Author, Book, BookInstance, Genre, Language
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(first_name='Ana',
+                                           last_name='Matute')
+        cls.language = Language.objects.create(name='Spanish')
+        cls.genre = Genre.objects.create(name='Fantasy')
+        cls.book = Book.objects.create(title='Olvidado rey Gudú',
+                                       summary='s', isbn='1',
+                                       author=cls.author,
+                                       language=cls.language)
+        cls.book.genre.add(cls.genre)
+        cls.copy = BookInstance.objects.create(book=cls.book, imprint='i',
+                                               status='a')
+
+    def setUp(self):
+        # Sin la caducidad de los ETag de los listados con LocMem
+        patcher = mock.patch.object(conditional, 'LIST_LOCAL_TIMEOUT', 10**9)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assertNotModified(self, url, etag, queries=1):
+        with self.assertNumQueries(queries):  # Solo los validadores
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_not_modified_without_rendering(self):
+        for url in (self.book.get_absolute_url(),
+                    self.author.get_absolute_url()):
+            self.assertNotModified(url, self.etag(url))
+        # Los listados no consultan la BD
+        for url in (reverse('books'), reverse('authors')):
+            self.assertNotModified(url, self.etag(url), queries=0)
+
+    def test_if_modified_since(self):
+        url = self.book.get_absolute_url()
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_book_etag_follows_copies(self):
+        url = self.book.get_absolute_url()
+        etags = [self.etag(url)]
+        self.copy.imprint = 'Other imprint'
+        self.copy.save()
+        etags.append(self.etag(url))
+        BookInstance.objects.create(book=self.book, imprint='i')
+        etags.append(self.etag(url))
+        BookInstance.objects.filter(pk=self.copy.pk).update(due_back=None)
+        etags.append(self.etag(url))
+        self.assertEqual(len(set(etags)), 4)
+
+    def test_book_etag_follows_author_and_genres(self):
+        url = self.book.get_absolute_url()
+        etags = [self.etag(url)]
+        self.author.last_name = 'Matute Ausejo'
+        self.author.save()
+        etags.append(self.etag(url))
+        self.book.genre.add(Genre.objects.create(name='Horror'))
+        etags.append(self.etag(url))
+        self.assertEqual(len(set(etags)), 3)
+
+    def test_lists_follow_new_rows(self):
+        books, authors = reverse('books'), reverse('authors')
+        before = self.etag(books), self.etag(authors)
+        author = Author.objects.create(first_name='Carmen',
+                                       last_name='Laforet')
+        Book.objects.create(title='Nada', summary='s', isbn='2',
+                            author=author)
+        self.assertNotEqual(self.etag(books), before[0])
+        self.assertNotEqual(self.etag(authors), before[1])
+
+    def test_book_follows_genre_and_language_names(self):
+        url = self.book.get_absolute_url()
+
+        def rename(obj):
+            obj.name += '!'
+            obj.save()
+
+        # Last-Modified va en segundos: una fecha anterior para notar el cambio
+        past = timezone.now() - dt.timedelta(minutes=1)
+        for change in (lambda: rename(self.genre),
+                       lambda: rename(self.language),
+                       self.genre.delete, self.language.delete):
+            for model in (Author, Book, BookInstance):
+                model.objects.update(updated_at=past)
+            response = self.client.get(url)
+            validators = {
+                'HTTP_IF_NONE_MATCH': response['ETag'],
+                'HTTP_IF_MODIFIED_SINCE': response['Last-Modified'],
+            }
+            change()
+            for header, value in validators.items():
+                response = self.client.get(url, **{header: value})
+                self.assertEqual(response.status_code, 200)
+
+    def test_lists_follow_counters_and_author_names(self):
+        books = reverse('books')
+        etags = [self.etag(books)]
+        self.copy.status = 'o'
+        self.copy.save()
+        etags.append(self.etag(books))
+        self.author.last_name = 'Matute Ausejo'
+        self.author.save()
+        etags.append(self.etag(books))
+        self.assertEqual(len(set(etags)), 3)
+
+    def test_list_etag_expires_with_local_cache(self):
+        url = reverse('authors')
+        with mock.patch.object(conditional, 'LIST_LOCAL_TIMEOUT', 5), \
+                mock.patch('time.time', return_value=1000.0):
+            etag = self.etag(url)
+        with mock.patch.object(conditional, 'LIST_LOCAL_TIMEOUT', 5), \
+                mock.patch('time.time', return_value=1006.0):
+            self.assertNotEqual(self.etag(url), etag)
+
+    def test_etag_depends_on_user(self):
+        url = self.book.get_absolute_url()
+        anonymous = self.etag(url)
+        User.objects.create_user('reader', password='pw12345678')
+        self.client.login(username='reader', password='pw12345678')
+        self.assertNotEqual(self.etag(url), anonymous)
+
+    def test_etag_depends_on_permissions(self):
+        url = self.book.get_absolute_url()
+        user = User.objects.create_user('reader', password='pw12345678')
+        self.client.login(username='reader', password='pw12345678')
+        before = self.etag(url)
+        user.user_permissions.add(
+            Permission.objects.get(codename='change_book'))
+        self.assertNotEqual(self.etag(url), before)
+
+    def test_deletions_are_not_hidden_by_last_modified(self):
+        other = Book.objects.create(title='Nada', summary='s', isbn='2',
+                                    author=self.author)
+        urls = (reverse('books'), self.author.get_absolute_url(),
+                reverse('authors'))
+        for url in urls:
+            self.assertFalse(self.client.get(url).has_header(
+                'Last-Modified'))
+        etags = [self.etag(url) for url in urls[:2]]
+        other.delete()
+        self.assertNotEqual(self.etag(urls[0]), etags[0])
+        self.assertNotEqual(self.etag(urls[1]), etags[1])
+
+        # Last-Modified va en segundos: una fecha anterior para notar el cambio
+        past = timezone.now() - dt.timedelta(minutes=1)
+        for model in (Author, Book, BookInstance):
+            model.objects.update(updated_at=past)
+        url = self.book.get_absolute_url()
+        last_modified = self.client.get(url)['Last-Modified']
+        self.copy.delete()
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_book_is_404(self):
+        response = self.client.get(reverse('book-detail', args=[999]))
+        self.assertEqual(response.status_code, 404)
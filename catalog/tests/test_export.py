@@ -0,0 +1,69 @@
+import csv
+import datetime as dt
+import gzip
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.loader import read_records
+from catalog.models import Author, Book, BookInstance, Genre, Language
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(first_name='Ana', last_name='Matute')
+        language = Language.objects.create(name='Spanish')
+        cls.book = Book.objects.create(title='Olvidado rey Gudú',
+                                       summary='s', isbn='1', author=author,
+                                       language=language)
+        cls.book.genre.set([Genre.objects.create(name='Fantasy'),
+                            Genre.objects.create(name='Epic')])
+        cls.staff = User.objects.create_user('staff', password='pw12345678',
+                                             is_staff=True)
+        today = dt.date.today()
+        for i, status in enumerate('aoom'):
+            BookInstance.objects.create(
+                book=cls.book, imprint=f'i{i}', status=status,
+                due_back=today + dt.timedelta(days=3 - i),
+                borrower=cls.staff if status == 'o' else None)
+
+    def download(self, dataset, fmt, **params):
+        self.client.login(username='staff', password='pw12345678')
+        response = self.client.get(
+            reverse('export', args=[dataset, fmt]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_staff_only(self):
+        response = self.client.get(reverse('export', args=['books', 'csv']))
+        self.assertEqual(response.status_code, 302)
+        self.client.login(username='staff', password='pw12345678')
+        response = self.client.get(reverse('export', args=['users', 'csv']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_books_round_trip_through_the_loader(self):
+        for fmt in ('csv', 'jsonl'):
+            content = self.download('books', fmt).decode()
+            [record] = list(read_records(io.StringIO(content), fmt))
+            self.assertEqual(record['title'], 'Olvidado rey Gudú')
+            self.assertEqual(record['author_last_name'], 'Matute')
+            self.assertEqual(record['language'], 'Spanish')
+            self.assertEqual(record['genres'], ['Epic', 'Fantasy'])
+            self.assertEqual(int(record['copies']), 4)
+
+    def test_loans(self):
+        content = self.download('loans', 'jsonl').decode()
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([r['imprint'] for r in rows], ['i2', 'i1'])
+        self.assertEqual({r['borrower'] for r in rows}, {'staff'})
+
+    def test_gzip(self):
+        content = gzip.decompress(self.download('copies', 'csv', gzip=1))
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0]['book_title'], 'Olvidado rey Gudú')
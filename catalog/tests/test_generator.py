@@ -0,0 +1,47 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from catalog.generator import CatalogGenerator
+from catalog.models import Author, Book, BookInstance
+
+
+class CatalogGeneratorTest(TestCase):
+    def test_same_seed_same_records(self):
+        a = list(CatalogGenerator(seed=7, books=20).book_records())
+        b = list(CatalogGenerator(seed=7, books=20).book_records())
+        c = list(CatalogGenerator(seed=8, books=20).book_records())
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_generate(self):
+        generator = CatalogGenerator(seed=1, books=30, authors=5, users=4,
+                                     batch_size=7)
+        books, copies = generator.generate()
+        self.assertEqual(books, 30)
+        self.assertEqual(Book.objects.count(), 30)
+        self.assertLessEqual(Author.objects.count(), 5)
+        self.assertEqual(BookInstance.objects.count(), copies)
+        self.assertGreaterEqual(copies, 30)
+        for bi in BookInstance.objects.exclude(status='o'):
+            self.assertIsNone(bi.borrower_id)
+        for bi in BookInstance.objects.filter(status='o'):
+            self.assertIsNotNone(bi.due_back)
+
+    def test_benchmark_views_command(self):
+        call_command('generate_catalog', books=10, users=2,
+                     stdout=io.StringIO())
+        out = io.StringIO()
+        call_command('benchmark_views', repeat=2, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertIn('p99 ms', lines[0])
+        views = {line.split()[0]: line.split()[1] for line in lines[1:]}
+        self.assertEqual(views['book-detail'], '200')
+        self.assertEqual(views['index'], '200')
+        # Cada detalle de la API con un pk de su propio modelo
+        for name in ('books', 'authors', 'copies', 'genres', 'languages'):
+            self.assertEqual(views[f'api-{name}-detail'], '200')
+        # Sin dejar atrás el superusuario del benchmark
+        self.assertFalse(User.objects.filter(is_superuser=True).exists())
@@ -0,0 +1,57 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from catalog.loader import CatalogLoader, read_records
+from catalog.models import Author, Book, BookInstance, Genre, Language
+
+
+CSV = '''title,summary,isbn,author_first_name,author_last_name,language,genres
+The Shining,Hotel,9780345806789,Stephen,King,English,Horror|Thriller
+Carrie,Prom,9780307743664,Stephen,King,English,Horror
+I Robot,Robots,9780194242363,Isaac,Asimov,Spanish,
+'''
+
+
+class CatalogLoaderTest(TestCase):
+    def test_load_csv_resolves_related_objects_once(self):
+        Genre.objects.create(name='Horror')
+        loader = CatalogLoader(batch_size=2)
+        loader.load(read_records(io.StringIO(CSV), 'csv'))
+        self.assertEqual(loader.books, 3)
+        self.assertEqual(Author.objects.count(), 2)
+        self.assertEqual(Language.objects.count(), 2)
+        self.assertEqual(Genre.objects.count(), 2)
+        shining = Book.objects.get(title='The Shining')
+        self.assertEqual(str(shining.author), 'King, Stephen')
+        self.assertEqual(shining.display_genre(), 'Horror, Thriller')
+        self.assertEqual(Book.objects.get(title='I Robot').genre.count(), 0)
+
+    def test_batch_query_count_does_not_depend_on_size(self):
+        records = [{'title': f'Book {i}', 'author_first_name': 'A',
+                    'author_last_name': f'B{i}', 'language': 'English',
+                    'genres': [f'G{i}'], 'copies': 1} for i in range(50)]
+        loader = CatalogLoader(batch_size=50)
+        # Autores, idiomas, géneros, libros, géneros del libro, copias y
+        # recuento de disponibilidad, más SAVEPOINT y RELEASE de la
+        # transacción del lote y de la de bulk_create de las copias
+        with self.assertNumQueries(11):
+            loader.load_chunk(records)
+        self.assertEqual(BookInstance.objects.count(), 50)
+
+    def test_import_catalog_command_jsonl(self):
+        records = [{'title': 'Dune', 'author_first_name': 'Frank',
+                    'author_last_name': 'Herbert', 'genres': ['SF'],
+                    'copies': 3}]
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(json.dumps(r) for r in records))
+        self.addCleanup(os.remove, path)
+        out = io.StringIO()
+        call_command('import_catalog', path, stdout=out)
+        self.assertIn('Imported 1 books and 3 copies', out.getvalue())
+        self.assertEqual(Book.objects.get().genre.get().name, 'SF')
@@ -0,0 +1,82 @@
+import json
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.handlers.asgi import ASGIHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from catalog.middleware import QueryTimingMiddleware
+from catalog.models import Author, Book
+
+
+@override_settings(QUERY_TIMING_SAMPLE_RATE=1, PAGE_CACHE_ENABLED=False)
+class QueryTimingMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(first_name='John', last_name='S')
+        for i in range(3):
+            Book.objects.create(title=f'Book {i}', summary='s', isbn='1',
+                                author=cls.author)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('books'))
+        header = response['Server-Timing']
+        self.assertIn('db;dur=', header)
+        self.assertIn('desc="2 queries"', header)
+        self.assertIn('tpl;dur=', header)
+
+    def test_structured_log(self):
+        with self.assertLogs('catalog.timing', 'INFO') as logs:
+            self.client.get(self.author.get_absolute_url())
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'catalog.views.AuthorDetailView')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['queries'], 3)
+
+    @override_settings(QUERY_TIMING_REPEAT_THRESHOLD=3)
+    def test_repeated_sql_is_flagged(self):
+        def n_plus_one(request):
+            for book in Book.objects.all():
+                Author.objects.get(pk=book.author_id)
+            return HttpResponse()
+
+        middleware = QueryTimingMiddleware(n_plus_one)
+        with self.assertLogs('catalog.timing', 'WARNING') as logs:
+            middleware(RequestFactory().get('/'))
+        record = json.loads(logs.records[0].getMessage().split(': ', 1)[1])
+        self.assertEqual(record['repeats'], 3)
+        self.assertIn('catalog_author', record['repeated_sql'])
+
+    @override_settings(QUERY_TIMING_SAMPLE_RATE=0)
+    def test_disabled(self):
+        response = self.client.get(reverse('books'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+@override_settings(QUERY_TIMING_SAMPLE_RATE=1, PAGE_CACHE_ENABLED=False)
+class AsyncMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(first_name='John', last_name='S')
+        Book.objects.create(title='Book', summary='s', isbn='1',
+                            author=author)
+
+    def test_asgi_handler_is_not_adapted(self):
+        middleware = [*settings.MIDDLEWARE,
+                      'catalog.middleware.ReplicaMiddleware']
+        with override_settings(MIDDLEWARE=middleware):
+            with self.assertNoLogs('django.request', 'DEBUG'):
+                ASGIHandler()
+
+    async def test_async_request_is_measured(self):
+        response = await self.async_client.get(reverse('books'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+    async def test_async_static_files(self):
+        url = staticfiles_storage.url('css/catalog.min.css')
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
@@ -0,0 +1,93 @@
+import datetime as dt
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.models import Author, Book, BookInstance
+from catalog.overdue import get_overdue_count, overdue_by_borrower
+
+
+class OverdueTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        today = dt.date.today()
+        cls.ana = User.objects.create_user('ana', password='pw12345678')
+        cls.luis = User.objects.create_user('luis', password='pw12345678')
+        cls.luis.is_staff = True
+        cls.luis.save()
+        a = Author.objects.create(first_name='John', last_name='Smith')
+        book = Book.objects.create(title='Dracula', author=a, summary='s',
+                                   isbn='1')
+        for borrower, days, status in ((cls.ana, -3, 'o'), (cls.ana, -1, 'o'),
+                                       (cls.luis, -2, 'o'), (cls.luis, 0, 'o'),
+                                       (cls.luis, -5, 'a')):
+            BookInstance.objects.create(
+                book=book, imprint='i', status=status, borrower=borrower,
+                due_back=today + dt.timedelta(days=days))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_overdue_queryset(self):
+        self.assertEqual(BookInstance.objects.overdue().count(), 3)
+        flags = BookInstance.objects.with_overdue().filter(overdue=True)
+        self.assertEqual(flags.count(), 3)
+        tomorrow = dt.date.today() + dt.timedelta(days=1)
+        self.assertEqual(BookInstance.objects.overdue(tomorrow).count(), 4)
+
+    def test_overdue_by_borrower(self):
+        today = dt.date.today()
+        self.assertEqual(list(overdue_by_borrower()), [
+            (self.ana.pk, 'ana', 2, today - dt.timedelta(days=3)),
+            (self.luis.pk, 'luis', 1, today - dt.timedelta(days=2)),
+        ])
+
+    def test_count_is_cached_and_invalidated(self):
+        self.assertEqual(get_overdue_count(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_overdue_count(), 3)
+        copy = BookInstance.objects.overdue().first()
+        copy.status = 'a'
+        copy.save()
+        self.assertEqual(get_overdue_count(), 2)
+
+    def test_bulk_writes_invalidate_count(self):
+        self.assertEqual(get_overdue_count(), 3)
+        BookInstance.objects.filter(borrower=self.ana).update(
+            due_back=dt.date.today())
+        self.assertEqual(get_overdue_count(), 1)
+        BookInstance.objects.filter(borrower=self.luis).delete()
+        self.assertEqual(get_overdue_count(), 0)
+
+    def test_loan_lists_use_sql_flag(self):
+        self.client.login(username='ana', password='pw12345678')
+        response = self.client.get(reverse('my-borrowed'))
+        loans = response.context['object_list']
+        self.assertTrue(all(copy.overdue for copy in loans))
+        self.assertContains(response, 'class="text-danger"', count=2)
+
+    def test_report_command(self):
+        out = StringIO()
+        call_command('overdue_report', stdout=out)
+        self.assertIn('ana: 2 overdue since', out.getvalue())
+        self.assertIn('3 overdue loans, 2 borrowers', out.getvalue())
+        with self.assertNumQueries(0):
+            self.assertEqual(get_overdue_count(), 3)
+
+        out = StringIO()
+        call_command('overdue_report', format='csv', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], 'borrower_id,borrower,loans,oldest')
+        self.assertEqual(len(lines), 3)
+
+    def test_staff_sidebar_shows_count(self):
+        self.client.login(username='luis', password='pw12345678')
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, 'Overdue loans: 3')
+        self.client.login(username='ana', password='pw12345678')
+        response = self.client.get(reverse('index'))
+        self.assertNotContains(response, 'Overdue loans')
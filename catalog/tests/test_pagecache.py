@@ -0,0 +1,160 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from catalog.loader import CatalogLoader
+from catalog.models import Author, Book, BookInstance, Genre, Language
+from catalog.pagecache import current_epoch, get_page, set_page
+from catalog.views import BookDetailView
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(first_name='Ana',
+                                           last_name='Matute')
+        cls.language = Language.objects.create(name='Spanish')
+        cls.genre = Genre.objects.create(name='Fantasy')
+        cls.book = Book.objects.create(title='Olvidado rey Gudú',
+                                       summary='s', isbn='1',
+                                       author=cls.author,
+                                       language=cls.language)
+        cls.book.genre.add(cls.genre)
+        cls.other = Book.objects.create(title='Primera memoria',
+                                        summary='s', isbn='2',
+                                        author=cls.author)
+        cls.copy = BookInstance.objects.create(book=cls.book, imprint='i',
+                                               status='a')
+
+    def setUp(self):
+        caches['pages'].clear()
+
+    def assertCached(self, url):
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.templates)
+        return response
+
+    def assertFresh(self, url, text):
+        response = self.client.get(url)
+        self.assertTrue(response.templates)
+        self.assertContains(response, text)
+
+    def test_anonymous_pages_are_cached(self):
+        for url in (self.book.get_absolute_url(), reverse('books'),
+                    f"{reverse('books')}?page=1",
+                    self.author.get_absolute_url(), reverse('authors')):
+            first = self.client.get(url)
+            self.assertTrue(first.templates)
+            self.assertEqual(self.assertCached(url).content, first.content)
+
+    def test_authenticated_users_are_not_served_from_cache(self):
+        url = self.book.get_absolute_url()
+        self.client.get(url)
+        User.objects.create_user('reader', password='pw12345678')
+        self.client.login(username='reader', password='pw12345678')
+        self.assertTrue(self.client.get(url).templates)
+
+    def test_cached_page_answers_if_none_match(self):
+        url = self.book.get_absolute_url()
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_book_change_invalidates_its_pages_only(self):
+        detail = self.book.get_absolute_url()
+        other = self.other.get_absolute_url()
+        author = self.author.get_absolute_url()
+        for url in (detail, other, author, reverse('books')):
+            self.client.get(url)
+        self.book.title = 'El río'
+        self.book.save()
+        self.assertFresh(detail, 'El río')
+        self.assertFresh(author, 'El río')
+        self.assertFresh(reverse('books'), 'El río')
+        self.assertCached(other)
+
+    def test_related_changes_invalidate_book_detail(self):
+        url = self.book.get_absolute_url()
+        self.client.get(url)
+        self.author.last_name = 'Matute Ausejo'
+        self.author.save()
+        self.assertFresh(url, 'Matute Ausejo')
+
+        self.genre.name = 'Fantasía'
+        self.genre.save()
+        self.assertFresh(url, 'Fantasía')
+
+        self.language.name = 'Castellano'
+        self.language.save()
+        self.assertFresh(url, 'Castellano')
+
+        self.book.genre.add(Genre.objects.create(name='Poetry'))
+        self.assertFresh(url, 'Poetry')
+
+    def test_copy_changes_invalidate_book_pages(self):
+        url, books = self.book.get_absolute_url(), reverse('books')
+        self.client.get(url)
+        self.client.get(books)
+        self.copy.status = 'o'
+        self.copy.save()
+        self.assertFresh(url, 'On loan')
+        self.assertFresh(books, '0 de 1 disponibles')
+
+        # Las actualizaciones masivas no emiten señales
+        BookInstance.objects.filter(pk=self.copy.pk).update(
+            imprint='Imprenta nueva')
+        self.assertFresh(url, 'Imprenta nueva')
+
+    def test_import_invalidates_and_warms(self):
+        books = reverse('books')
+        self.client.get(books)
+        CatalogLoader().load([{
+            'title': 'Alfanhuí', 'author_first_name': 'Rafael',
+            'author_last_name': 'Sánchez Ferlosio', 'genres': [],
+        }])
+        self.assertFresh(books, 'Alfanhuí')
+
+        caches['pages'].clear()
+        out = StringIO()
+        call_command('warm_page_cache', stdout=out)
+        self.assertIn('Warmed', out.getvalue())
+        self.assertCached(books + '?page=1')
+        self.assertCached(self.book.get_absolute_url())
+
+    def test_writes_during_rendering_are_not_cached(self):
+        url = self.book.get_absolute_url()
+        views = 'catalog.views.BookDetailView.get_page_cache_tags'
+        original = BookDetailView.get_page_cache_tags
+
+        def rename_while_rendering(view, context):
+            self.book.title = 'El río'
+            self.book.save()
+            return original(view, context)
+
+        with mock.patch(views, rename_while_rendering):
+            self.client.get(url)
+        self.assertFresh(url, 'El río')
+
+    def test_replica_pages_wait_for_recent_invalidations(self):
+        request = RequestFactory().get('/catalog/books/')
+        self.book.save()
+        epoch = current_epoch()
+        set_page(request, HttpResponse('réplica'), {'books'}, epoch,
+                 replica=True)
+        self.assertIsNone(get_page(request))
+        set_page(request, HttpResponse('primaria'), {'books'}, epoch)
+        self.assertEqual(get_page(request).content, b'primaria')
+        with override_settings(REPLICA_STICKY_SECONDS=0):
+            set_page(request, HttpResponse('réplica'), {'books'}, epoch,
+                     replica=True)
+        self.assertEqual(get_page(request).content, 'réplica'.encode())
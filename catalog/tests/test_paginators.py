@@ -0,0 +1,169 @@
+import datetime as dt
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog.models import Author, Book, BookInstance
+from catalog.paginators import KeysetPaginator, InvalidCursor
+from catalog.paginators import (
+    EstimatedCountPaginator, _count_key, cached_count, refresh_count,
+)
+
+
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Nombres repetidos para forzar el desempate por pk
+        for i in range(13):
+            Author.objects.create(first_name=f'Name {i % 4}',
+                                  last_name=f'Surname {i % 3}')
+        book = Book.objects.create(title='Book', summary='s', isbn='1')
+        today = dt.date.today()
+        for i in range(7):
+            due = None if i % 3 == 0 else today + dt.timedelta(days=i % 2)
+            BookInstance.objects.create(book=book, imprint='i', due_back=due)
+
+    def walk(self, paginator):
+        pages, page = [], paginator.page()
+        pages.append(page)
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            pages.append(page)
+        return pages
+
+    def test_forward_walk_matches_ordering(self):
+        qs = Author.objects.all()
+        pages = self.walk(KeysetPaginator(qs, 3))
+        seen = [a.pk for p in pages for a in p]
+        expected = qs.order_by('first_name', 'last_name', 'pk')
+        self.assertEqual(seen, list(expected.values_list('pk', flat=True)))
+        self.assertEqual([len(p) for p in pages], [3, 3, 3, 3, 1])
+
+    def test_backward_walk(self):
+        paginator = KeysetPaginator(Author.objects.all(), 3)
+        pages = self.walk(paginator)
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            page = paginator.page(page.previous_cursor)
+            self.assertEqual(list(page), list(expected))
+        self.assertFalse(page.has_previous())
+
+    def test_nullable_ordering_puts_nulls_last(self):
+        pages = self.walk(KeysetPaginator(BookInstance.objects.all(), 2))
+        dues = [bi.due_back for p in pages for bi in p]
+        self.assertEqual(len(dues), 7)
+        self.assertEqual(dues[-3:], [None, None, None])
+        self.assertEqual(dues[:4], sorted(dues[:4]))
+
+    def test_page_does_not_count(self):
+        paginator = KeysetPaginator(Author.objects.all(), 3)
+        cursor = paginator.page().next_cursor
+        with self.assertNumQueries(1):
+            paginator.page(cursor)
+
+    def test_tampered_cursor_is_rejected(self):
+        paginator = KeysetPaginator(Author.objects.all(), 3)
+        cursor = paginator.page().next_cursor
+        with self.assertRaises(InvalidCursor):
+            paginator.page(cursor[:-2] + 'xx')
+
+    def test_list_view_cursor_mode(self):
+        response = self.client.get(reverse('authors') + '?cursor=')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['is_paginated'])
+        self.assertEqual(len(response.context['author_list']), 3)
+        self.assertContains(response, '?cursor=')
+        self.assertNotContains(response, 'Page 1 of')
+
+    def test_list_view_invalid_cursor(self):
+        response = self.client.get(reverse('books') + '?cursor=bad')
+        self.assertEqual(response.status_code, 404)
+
+
+class EstimatedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(first_name='Ana', last_name='Matute')
+        for i in range(5):
+            Book.objects.create(title=f'Book {i}', summary='s', isbn='1',
+                                author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_small_tables_are_counted(self):
+        paginator = EstimatedCountPaginator(Book.objects.all(), 2)
+        self.assertEqual(paginator.count, 5)
+        self.assertFalse(paginator.is_estimated)
+        self.assertIsNone(cached_count(Book.objects.all()))
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=3)
+    def test_large_counts_are_cached(self):
+        qs = Book.objects.filter(title__startswith='Book')
+        self.assertEqual(EstimatedCountPaginator(qs, 2).count, 5)
+        Book.objects.filter(title='Book 4').delete()
+        paginator = EstimatedCountPaginator(qs, 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 5)
+        self.assertTrue(paginator.is_estimated)
+        self.assertEqual(refresh_count(qs), 4)
+        self.assertEqual(EstimatedCountPaginator(qs, 2).count, 4)
+
+    @override_settings(ESTIMATED_COUNT_TTL=0)
+    def test_stale_count_is_refreshed_under_same_key(self):
+        qs = Book.objects.order_by('pk')
+        refresh_count(qs)
+        Book.objects.create(title='Book 5', summary='s', isbn='1')
+        with mock.patch('catalog.paginators.threading.Thread') as thread:
+            self.assertEqual(cached_count(qs), 5)
+            stale, key = thread.call_args.kwargs['args']
+            # Alias fijado antes de pasar al hilo, y la misma clave
+            self.assertEqual(stale._db, qs.db)
+            self.assertEqual(key, _count_key(qs))
+            refresh_count(stale, key)
+            self.assertEqual(cached_count(qs), 6)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=3)
+    def test_pages_beyond_estimate(self):
+        qs = Book.objects.order_by('pk')
+        refresh_count(qs)
+        Book.objects.create(title='Book 5', summary='s', isbn='1')
+        paginator = EstimatedCountPaginator(qs, 2)
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertEqual(paginator.validate_number('4'), 4)
+        page = paginator.page(3)
+        self.assertEqual([b.title for b in page], ['Book 4', 'Book 5'])
+        self.assertFalse(page.has_next())
+        self.assertEqual(page.end_index(), 6)
+        with self.assertRaises(EmptyPage):
+            paginator.page(4)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=3)
+    def test_rows_beyond_low_estimate_are_reachable(self):
+        qs = Book.objects.order_by('pk')
+        refresh_count(qs)
+        for i in range(5, 9):
+            Book.objects.create(title=f'Book {i}', summary='s', isbn='1')
+        paginator = EstimatedCountPaginator(qs, 2)
+        self.assertEqual(paginator.num_pages, 3)
+        titles, number = [], 1
+        while True:
+            page = paginator.page(number)
+            titles += [b.title for b in page]
+            if not page.has_next():
+                break
+            number = page.next_page_number()
+        self.assertEqual(titles, [f'Book {i}' for i in range(9)])
+        self.assertEqual(number, 5)
+        self.assertEqual(paginator.num_pages, 5)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=3)
+    def test_template_shows_about(self):
+        response = self.client.get(reverse('books'))
+        self.assertContains(response, 'Page 1 of 3.')
+        response = self.client.get(reverse('books'), {'page': 2})
+        self.assertTrue(response.context['paginator'].is_estimated)
+        self.assertContains(response, 'Page 2 of about 3 pages.')
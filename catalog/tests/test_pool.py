@@ -0,0 +1,129 @@
+import statistics
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from catalog.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def test_reuses_released_connections(self):
+        pool = ConnectionPool(max_size=2)
+        conn, reused, _ = pool.acquire(FakeConnection)
+        self.assertFalse(reused)
+        pool.release(conn)
+        again, reused, _ = pool.acquire(FakeConnection)
+        self.assertIs(again, conn)
+        self.assertTrue(reused)
+        self.assertEqual(pool.stats.created, 1)
+        self.assertEqual(pool.stats.checkouts, 2)
+
+    def test_discards_unhealthy_connections(self):
+        pool = ConnectionPool(check=lambda c: not c.closed)
+        conn, _, _ = pool.acquire(FakeConnection)
+        pool.release(conn)
+        conn.closed = True
+        fresh, reused, _ = pool.acquire(FakeConnection)
+        self.assertIsNot(fresh, conn)
+        self.assertFalse(reused)
+        self.assertEqual(pool.stats.discarded, 1)
+
+    def test_waits_for_a_free_slot(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        conn, _, _ = pool.acquire(FakeConnection)
+        threading.Timer(0.05, pool.release, (conn,)).start()
+        again, reused, wait = pool.acquire(FakeConnection)
+        self.assertIs(again, conn)
+        self.assertGreaterEqual(wait, 0.04)
+        self.assertEqual(pool.stats.wait_max, wait)
+
+    def test_timeout(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.acquire(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(FakeConnection)
+        self.assertEqual(pool.stats.timeouts, 1)
+
+    def test_failed_connect_frees_the_slot(self):
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+
+        def broken():
+            raise OSError('refused')
+
+        with self.assertRaises(OSError):
+            pool.acquire(broken)
+        conn, _, _ = pool.acquire(FakeConnection)
+        self.assertIsInstance(conn, FakeConnection)
+
+
+class FakePsycopgConnection(FakeConnection):
+    def __init__(self, status):
+        super().__init__()
+        self.info = SimpleNamespace(transaction_status=status)
+        self.autocommit = False
+        self.rolled_back = False
+
+    def rollback(self):
+        self.rolled_back = True
+        self.info.transaction_status = 0
+
+
+class PooledCloseTest(SimpleTestCase):
+    def test_connection_is_returned_idle_in_autocommit(self):
+        from psycopg2 import extensions
+        from catalog.pooled_postgresql.base import DatabaseWrapper
+        settings_dict = {**connection.settings_dict,
+                         'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}}
+        wrapper = DatabaseWrapper(settings_dict, alias='pool-close-test')
+        fake = FakePsycopgConnection(extensions.TRANSACTION_STATUS_INTRANS)
+        wrapper.connection, _, _ = wrapper.pool.acquire(lambda: fake)
+        wrapper._close()
+        self.assertTrue(fake.rolled_back)
+        self.assertTrue(fake.autocommit)
+
+        # Sin transacción abierta pero con el autocommit desactivado
+        wrapper.connection, _, _ = wrapper.pool.acquire(None)
+        self.assertIs(wrapper.connection, fake)
+        fake.autocommit, fake.rolled_back = False, False
+        wrapper._close()
+        self.assertFalse(fake.rolled_back)
+        self.assertTrue(fake.autocommit)
+        self.assertIn(fake, wrapper.pool._idle)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+class PooledBackendTest(SimpleTestCase):
+    """Abrir y cerrar la conexión en cada petición frente al pool."""
+    databases = {'default'}
+    ROUNDS = 50
+
+    def p99(self, engine):
+        from django.db.utils import load_backend
+        settings_dict = {**connection.settings_dict, 'ENGINE': engine,
+                         'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True}
+        wrapper = load_backend(engine).DatabaseWrapper(settings_dict)
+        times = []
+        for _ in range(self.ROUNDS):
+            start = time.perf_counter()
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            wrapper.close()
+            times.append(time.perf_counter() - start)
+        return statistics.quantiles(times, n=100)[98]
+
+    def test_reuse_lowers_p99(self):
+        plain = self.p99('django.db.backends.postgresql')
+        pooled = self.p99('catalog.pooled_postgresql')
+        self.assertLess(pooled, plain)
@@ -0,0 +1,69 @@
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from catalog import views
+from catalog.middleware import ReplicaMiddleware, STICKY_COOKIE
+from catalog.models import Book
+from catalog.routers import ReplicaRouter, use_replica
+
+
+class ReplicaRouterTest(SimpleTestCase):
+    router = ReplicaRouter()
+
+    def test_reads_go_to_primary_by_default(self):
+        self.assertIsNone(self.router.db_for_read(Book))
+
+    def test_catalog_reads_go_to_replica_when_enabled(self):
+        token = use_replica.set(True)
+        try:
+            self.assertEqual(self.router.db_for_read(Book), 'replica')
+            # Usuarios y sesiones siempre en la primaria
+            self.assertIsNone(self.router.db_for_read(User))
+            self.assertEqual(self.router.db_for_write(Book), 'default')
+        finally:
+            use_replica.reset(token)
+
+    def test_replica_is_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'catalog'))
+        self.assertIsNone(self.router.allow_migrate('default', 'catalog'))
+
+
+@override_settings(REPLICA_STICKY_SECONDS=5)
+class ReplicaMiddlewareTest(SimpleTestCase):
+    factory = RequestFactory()
+
+    def run_view(self, request, view):
+        seen = []
+
+        def get_response(request):
+            middleware.process_view(request, view, (), {})
+            seen.append(ReplicaRouter().db_for_read(Book))
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        response = middleware(request)
+        self.assertFalse(use_replica.get())
+        return seen[0], response
+
+    def test_marked_views_read_from_replica(self):
+        for view in (views.index, views.BookListView.as_view()):
+            db, _ = self.run_view(self.factory.get('/'), view)
+            self.assertEqual(db, 'replica')
+
+    def test_write_views_read_from_primary(self):
+        view = views.renew_book_librarian
+        db, _ = self.run_view(self.factory.get('/'), view)
+        self.assertIsNone(db)
+
+    def test_post_makes_reads_sticky(self):
+        view = views.AuthorCreate.as_view()
+        db, response = self.run_view(self.factory.post('/'), view)
+        self.assertIsNone(db)
+        cookie = response.cookies[STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], 5)
+
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        db, _ = self.run_view(request, views.BookListView.as_view())
+        self.assertIsNone(db)
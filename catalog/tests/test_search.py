@@ -0,0 +1,45 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.models import Author, Book
+from catalog.search import search_books
+
+
+class BookSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        king = Author.objects.create(first_name='Stephen', last_name='King')
+        asimov = Author.objects.create(first_name='Isaac', last_name='Asimov')
+        Book.objects.create(title='The Shining', author=king,
+                            summary='A hotel in winter', isbn='9780345806789')
+        Book.objects.create(title='I Robot', author=asimov,
+                            summary='Robot stories', isbn='9780194242363')
+        Book.objects.create(title='Foundation', author=asimov,
+                            summary='Galactic empire', isbn='9780553293357')
+
+    def titles(self, text):
+        return [b.title for b in search_books(text)]
+
+    def test_search_by_title(self):
+        self.assertEqual(self.titles('shining'), ['The Shining'])
+
+    def test_search_by_summary(self):
+        self.assertEqual(self.titles('empire'), ['Foundation'])
+
+    def test_search_by_isbn(self):
+        self.assertEqual(self.titles('9780194242363'), ['I Robot'])
+
+    def test_search_by_author(self):
+        self.assertEqual(self.titles('Asimov'), ['Foundation', 'I Robot'])
+
+    def test_search_view(self):
+        response = self.client.get(reverse('search'), {'q': 'robot'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'catalog/book_search.html')
+        self.assertEqual(len(response.context['book_list']), 1)
+        self.assertContains(response, 'I Robot')
+
+    def test_search_view_without_query(self):
+        response = self.client.get(reverse('search'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['book_list']), 0)
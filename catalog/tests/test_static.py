@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from catalog.storage import minify_css
+
+
+class MinifyCssTest(SimpleTestCase):
+    def test_minify(self):
+        css = '''/*! Licencia */
+        /* comentario */
+        .a > .b ,  .c {
+            color : red ;
+            content: "a ,  b";
+            margin: 0 auto;
+        }
+        .d :hover { }
+        /*# sourceMappingURL=x.map */'''
+        self.assertEqual(
+            minify_css(css),
+            '/*! Licencia */.a>.b,.c{color :red;content:"a ,  b";'
+            'margin:0 auto}.d :hover{}')
+
+
+class CollectStaticTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_bundle_is_hashed_and_compressed(self):
+        with override_settings(STATIC_ROOT=self.root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            url = staticfiles_storage.url('css/catalog.min.css')
+        with open(os.path.join(self.root, 'staticfiles.json')) as f:
+            hashed = json.load(f)['paths']['css/catalog.min.css']
+        self.assertTrue(url.endswith(hashed))
+        path = os.path.join(self.root, hashed)
+        self.assertTrue(os.path.exists(path + '.gz'))
+        with open(path) as f:
+            bundle = f.read()
+        self.assertIn('Bootstrap  v5.3.2', bundle)
+        self.assertIn('.logout-button{', bundle)
+        self.assertIn('.content-list li:before{', bundle)
+        self.assertNotIn('sourceMappingURL', bundle)
+
+
+class StaticPagesTest(TestCase):
+    def test_pages_use_local_bundle(self):
+        response = self.client.get(reverse('index'))
+        self.assertContains(response, staticfiles_storage.url(
+            'css/catalog.min.css'))
+        self.assertNotContains(response, 'cdn.jsdelivr.net')
+
+    def test_hashed_files_are_immutable(self):
+        url = staticfiles_storage.url('css/catalog.min.css')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=315360000', response['Cache-Control'])
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.models import Author, Book, BookInstance, Genre
+from catalog import stats
+from catalog.stats import STATS_CACHE_KEY, compute_stats, get_stats
+
+
+class IndexStatsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        a = Author.objects.create(first_name='John', last_name='Smith')
+        Genre.objects.create(name='Fantasy')
+        cls.book = Book.objects.create(title='Dracula', author=a,
+                                       summary='s', isbn='1234567890123')
+        Book.objects.create(title='Emma', author=a, summary='s', isbn='1')
+        BookInstance.objects.create(book=cls.book, imprint='i', status='a')
+        BookInstance.objects.create(book=cls.book, imprint='i', status='o')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_compute_stats_in_one_query(self):
+        with self.assertNumQueries(1):
+            stats = compute_stats()
+        self.assertEqual(stats, {
+            'num_books': 2,
+            'num_instances': 2,
+            'num_instances_available': 1,
+            'num_authors': 1,
+            'num_genres': 1,
+            'num_books_containing_word': 2,
+        })
+
+    def test_stats_are_cached(self):
+        get_stats()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_stats()['num_books'], 2)
+
+    def test_save_invalidates_cache(self):
+        get_stats()
+        Genre.objects.create(name='Horror')
+        self.assertEqual(get_stats()['num_genres'], 2)
+
+    def test_delete_invalidates_cache(self):
+        get_stats()
+        BookInstance.objects.filter(status='o').first().delete()
+        self.assertEqual(get_stats()['num_instances'], 1)
+
+    def test_bulk_writes_invalidate_cache(self):
+        copies = BookInstance.objects.all()
+        writes = (
+            lambda: copies.update(status='a'),
+            lambda: BookInstance.objects.bulk_create(
+                [BookInstance(book=self.book, imprint='i', status='a')]),
+            lambda: copies.filter(status='o').delete(),
+        )
+        for write in writes:
+            get_stats()
+            write()
+            self.assertEqual(get_stats(), compute_stats())
+        get_stats()
+        copy = BookInstance.objects.first()
+        copy.status = 'm'
+        BookInstance.objects.bulk_update([copy], ['status'])
+        self.assertIsNone(cache.get(STATS_CACHE_KEY))
+
+    def test_local_cache_entry_expires(self):
+        # Con LocMem las invalidaciones no llegan a los demás procesos
+        with mock.patch.object(cache, 'set') as cache_set:
+            get_stats()
+        timeout = cache_set.call_args.args[2]
+        self.assertEqual(timeout, stats.STATS_LOCAL_TIMEOUT)
+
+    def test_index_shows_stats(self):
+        response = self.client.get(reverse('index'))
+        self.assertEqual(response.context['num_instances_available'], 1)
+        self.assertContains(response, '<strong>Books:</strong> 2')
@@ -1,4 +1,6 @@
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from catalog.models import Author
 import datetime as dt
@@ -10,6 +12,7 @@ from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 
 
+@override_settings(PAGE_CACHE_ENABLED=False)
 class AuthorListViewTest(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -390,3 +393,165 @@ class AuthorCreateViewTest(TestCase):
         self.test_user.save()
         response = self.client.get(self.create_author_url)
         self.assertEqual(response.status_code, 403)
+
+
+class ListViewQueryCountTest(TestCase):
+    """Las listas se pintan con un número fijo de consultas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.librarian = User.objects.create_user(username=u2, password=p2)
+        cls.librarian.is_staff = True
+        cls.librarian.save()
+        permission = Permission.objects.get(codename='can_mark_returned')
+        cls.librarian.user_permissions.add(permission)
+        for i in range(10):
+            a = Author.objects.create(first_name=f'A{i}', last_name='B')
+            book = Book.objects.create(title=f'Book {i}', summary='s',
+                                       isbn='1', author=a)
+            BookInstance.objects.create(
+                book=book, imprint='i', status='o',
+                due_back=dt.date.today(), borrower=cls.librarian)
+
+    def test_book_list(self):
+        # COUNT de la paginación + la página con el autor en un JOIN (los
+        # validadores HTTP salen de la caché)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('books'))
+        self.assertContains(response, 'Book 0</a> (B, A0)')
+
+    def count_queries(self, url, rows):
+        BookInstance.objects.exclude(
+            pk__in=BookInstance.objects.all()[:rows]).update(status='a')
+        self.client.login(username=u2, password=p2)
+        self.client.get(url)  # Permisos ya cacheados en ambos casos
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['bookinstance_list']), rows)
+        return len(ctx)
+
+    def test_my_borrowed_constant_queries(self):
+        url = reverse('my-borrowed')
+        self.assertEqual(self.count_queries(url, 10),
+                         self.count_queries(url, 1))
+
+    def test_all_borrowed_constant_queries(self):
+        url = reverse('all-borrowed')
+        self.assertEqual(self.count_queries(url, 10),
+                         self.count_queries(url, 1))
+
+
+class DetailViewQueryCountTest(TestCase):
+    """Las fichas no lanzan consultas por copia ni por libro."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(first_name='John', last_name='S')
+        language = Language.objects.create(name='English')
+        cls.book = Book.objects.create(title='Book', summary='s', isbn='1',
+                                       author=cls.author, language=language)
+        cls.book.genre.set([Genre.objects.create(name='Fantasy'),
+                            Genre.objects.create(name='Horror')])
+        for i in range(20):
+            BookInstance.objects.create(book=cls.book, imprint='i',
+                                        status='maor'[i % 4])
+        for i in range(5):
+            Book.objects.create(title=f'Other {i}', summary='s', isbn='1',
+                                author=cls.author)
+
+    def test_book_detail(self):
+        # Validadores HTTP + libro con autor e idioma, géneros y copias
+        with self.assertNumQueries(4):
+            response = self.client.get(self.book.get_absolute_url())
+        self.assertContains(response, 'On loan')
+        self.assertContains(response, 'Fantasy')
+        self.assertContains(response, 'Horror')
+
+    def test_author_detail(self):
+        # Validadores HTTP + autor y sus libros, una sola vez aunque la
+        # plantilla los use dos
+        with self.assertNumQueries(3):
+            response = self.client.get(self.author.get_absolute_url())
+        self.assertEqual(len(response.context['book_list']), 6)
+
+
+class BulkLoanViewTest(TestCase):
+    """Renovación y devolución en bloque desde ``all-borrowed``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.librarian = User.objects.create_user(username=u2, password=p2)
+        permission = Permission.objects.get(codename='can_mark_returned')
+        cls.librarian.user_permissions.add(permission)
+        User.objects.create_user(username=u1, password=p1)
+        author = Author.objects.create(first_name='A', last_name='B')
+        cls.book = Book.objects.create(title='Book', summary='s', isbn='1',
+                                       author=author)
+        cls.copies = [
+            BookInstance.objects.create(
+                book=cls.book, imprint='i', status='o',
+                due_back=dt.date.today(), borrower=cls.librarian)
+            for _ in range(3)
+        ]
+        cls.available = BookInstance.objects.create(
+            book=cls.book, imprint='i', status='a')
+
+    def post(self, copies, **data):
+        self.client.login(username=u2, password=p2)
+        data['copies'] = [str(c.pk) for c in copies]
+        return self.client.post(reverse('all-borrowed'), data)
+
+    def test_permission_required(self):
+        self.client.login(username=u1, password=p1)
+        response = self.client.post(reverse('all-borrowed'), {
+            'action': 'return', 'copies': [str(self.copies[0].pk)]})
+        self.assertEqual(response.status_code, 403)
+
+    def test_bulk_renew(self):
+        date = dt.date.today() + dt.timedelta(weeks=2)
+        response = self.post(self.copies[:2], action='renew',
+                             renewal_date=date)
+        self.assertRedirects(response, reverse('all-borrowed'))
+        due = [BookInstance.objects.get(pk=c.pk).due_back
+               for c in self.copies]
+        self.assertEqual(due, [date, date, dt.date.today()])
+
+    def test_bulk_renew_applies_renewal_date_rules(self):
+        for date, error in (
+                (dt.date.today() - dt.timedelta(days=1),
+                 'Invalid date - renewal in past'),
+                (dt.date.today() + dt.timedelta(weeks=5),
+                 'Invalid date - renewal more than 4 weeks ahead'),
+                ('', 'Renewal date is required')):
+            response = self.post(self.copies, action='renew',
+                                 renewal_date=date)
+            self.assertEqual(response.status_code, 400)
+            self.assertFormError(response.context['bulk_form'],
+                                 'renewal_date', error)
+        self.assertFalse(BookInstance.objects.exclude(
+            due_back=dt.date.today()).filter(status='o').exists())
+
+    def test_bulk_return(self):
+        response = self.post(self.copies[1:], action='return')
+        self.assertRedirects(response, reverse('all-borrowed'))
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.copies_on_loan, 1)
+        self.assertEqual(self.book.copies_available, 3)
+        copy = BookInstance.objects.get(pk=self.copies[2].pk)
+        self.assertEqual((copy.status, copy.due_back, copy.borrower),
+                         ('a', None, None))
+
+    def test_row_errors_roll_back_everything(self):
+        missing = uuid.uuid4()
+        self.client.login(username=u2, password=p2)
+        response = self.client.post(reverse('all-borrowed'), {
+            'action': 'return',
+            'copies': [str(self.copies[0].pk), str(self.available.pk),
+                       str(missing), 'nope']})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.context['bulk_form'].row_errors, {
+            str(self.available.pk): 'Not on loan',
+            str(missing): 'Unknown copy', 'nope': 'Unknown copy'})
+        self.assertContains(response, 'Not on loan', status_code=400)
+        self.assertEqual(
+            BookInstance.objects.get(pk=self.copies[0].pk).status, 'o')
@@ -0,0 +1,69 @@
+import datetime as dt
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+
+@override_settings(VISITS_FLUSH_EVERY=3)
+class VisitCounterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def stored(self):
+        return self.client.session.get('num_visits')
+
+    def test_visits_are_batched(self):
+        url = reverse('index')
+        shown, stored = [], []
+        for _ in range(7):
+            response = self.client.get(url)
+            shown.append(response.context['num_visits'])
+            stored.append(self.stored())
+        self.assertEqual(shown, list(range(7)))
+        # Primera visita directa; después, cada tres
+        self.assertEqual(stored, [1, 1, 1, 4, 4, 4, 7])
+
+    def test_batched_visit_does_not_write_the_session(self):
+        url = reverse('index')
+        self.client.get(url)
+        with self.assertNumQueries(1):  # Solo la lectura de la sesión
+            self.client.get(url)
+
+    def test_pending_visits_survive_login(self):
+        url = reverse('index')
+        self.client.get(url)
+        self.client.get(url)
+        User.objects.create_user('reader', password='pw12345678')
+        self.client.login(username='reader', password='pw12345678')
+        self.assertEqual(self.client.get(url).context['num_visits'], 2)
+
+    def test_counter_entry_lost_between_add_and_incr(self):
+        url = reverse('index')
+        self.client.get(url)
+        with mock.patch.object(cache, 'add', return_value=False):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['num_visits'], 1)
+        self.assertEqual(self.client.get(url).context['num_visits'], 2)
+
+
+class CleanupSessionsTest(TestCase):
+    def test_deletes_expired_sessions_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'old{i}', session_data='',
+                                   expire_date=now - dt.timedelta(days=1))
+        Session.objects.create(session_key='live', session_data='',
+                               expire_date=now + dt.timedelta(days=1))
+        out = StringIO()
+        call_command('cleanup_sessions', batch_size=2, stdout=out)
+        self.assertIn('Deleted 5 expired sessions', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('pk', flat=True)),
+                         ['live'])
@@ -1,6 +1,6 @@
+from django.conf import settings
 from django.urls import path
-from . import views
-from .views import AuthorDetailView as ADV
+from . import api, autocomplete, views
 from .views import LoanedBooksByUserListView as LBULV
 from .views import LoanedBooksListView as LBLV
 from .views import AuthorUpdate as AU
@@ -8,11 +8,20 @@ from .views import AuthorDelete as AD
 from .views import BookUpdate as BU
 from .views import BookDelete as BD
 
+# Vistas de solo lectura: asíncronas si se sirve con ASGI
+if settings.CATALOG_ASYNC_VIEWS:
+    from . import async_views as read_views
+else:
+    read_views = views
+ADV = read_views.AuthorDetailView
+BDV = read_views.BookDetailView
+
 urlpatterns = [
-    path('', views.index, name='index'),
-    path('books/', views.BookListView.as_view(), name='books'),
-    path('authors/', views.AuthorListView.as_view(), name='authors'),
-    path('book/<int:pk>', views.BookDetailView.as_view(), name='book-detail'),
+    path('', read_views.index, name='index'),
+    path('books/', read_views.BookListView.as_view(), name='books'),
+    path('authors/', read_views.AuthorListView.as_view(), name='authors'),
+    path('book/<int:pk>', BDV.as_view(), name='book-detail'),
+    path('search/', views.BookSearchView.as_view(), name='search'),
     path('author/<int:pk>', ADV.as_view(), name='author-detail'),
 ]
 
@@ -40,3 +49,22 @@ urlpatterns += [
     path('book/<int:pk>/update/', BU.as_view(), name='book-update'),
     path('book/<int:pk>/delete/', BD.as_view(), name='book-delete'),
 ]
+
+urlpatterns += [
+    path('export/<str:dataset>.<str:fmt>', views.export_catalog,
+         name='export'),
+]
+
+urlpatterns += [
+    path('autocomplete/<str:source>/', autocomplete.autocomplete,
+         name='autocomplete'),
+]
+
+# API JSON (ver catalog/api.py)
+for name in api.RESOURCES:
+    urlpatterns += [
+        path(f'api/{name}/', api.resource_list, {'resource': name},
+             name=f'api-{name}'),
+        path(f'api/{name}/<str:pk>', api.resource_detail, {'resource': name},
+             name=f'api-{name}-detail'),
+    ]
@@ -1,80 +1,210 @@
-from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponseRedirect
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import get_object_or_404
+from django.http import HttpResponseRedirect, Http404
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
 from django.urls import reverse, reverse_lazy
 from django.views import generic
 from django.views.generic.edit import CreateView, UpdateView, DeleteView
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.auth.mixins import PermissionRequiredMixin
 from django.contrib.auth.decorators import permission_required, login_required
+from django.contrib.admin.views.decorators import staff_member_required
 import datetime as dt
 
-from .models import Book, Author, Genre
+from .models import Book, Author
 from .models import BookInstance as BII
-from .forms import RenewBookForm
-
-
+from .forms import RenewBookForm, BulkLoanForm, BookForm
+from .stats import get_stats
+from .paginators import KeysetPaginator, InvalidCursor
+from .paginators import EstimatedCountPaginator
+from .search import search_books
+from .routers import reads_from_replica
+from .visits import count_visit
+from .conditional import ConditionalGetMixin
+from .conditional import book_validators, book_list_validators
+from .conditional import author_validators, author_list_validators
+from .pagecache import PageCacheMixin
+from .export import DATASETS, FORMATS, export
+
+
+@reads_from_replica
 def index(request):
     """View function for home page of site."""
-    num_books = Book.objects.all().count()
-    num_instances = BII.objects.all().count()
-    a = 'a'
-    num_instances_available = BII.objects.filter(status__exact=a).count()
-    num_authors = Author.objects.count()
-    num_genres = Genre.objects.count()
-    nbc_w = Book.objects.filter(title__icontains=a).count()
-    num_visits = request.session.get('num_visits', 0)
-    request.session['num_visits'] = num_visits + 1
+    # Visitas acumuladas en caché: no se reescribe la sesión en cada visita
+    num_visits = count_visit(request.session)
 
+    # Contadores agregados en una sola consulta y servidos desde caché
     context = {
-        'num_books': num_books,
-        'num_instances': num_instances,
-        'num_instances_available': num_instances_available,
-        'num_authors': num_authors,
-        'num_genres': num_genres,
-        'num_books_containing_word': nbc_w,
+        **get_stats(),
         'num_visits': num_visits,
     }
 
-    return render(request, 'index.html', context=context)
-
-
-class BookListView(generic.ListView):
+    # TemplateResponse: QueryTimingMiddleware mide el renderizado aparte
+    return TemplateResponse(request, 'index.html', context=context)
+
+
+class KeysetPaginationMixin:
+    """
+    Paginación por cursor para ``ListView``.
+
+    Se activa con el parámetro ``?cursor=`` (vacío para la primera página);
+    sin él se mantiene la paginación por número de página, con el total
+    estimado en tablas grandes (``EstimatedCountPaginator``). El orden es
+    ``keyset_ordering`` o, por defecto, el ``ordering`` del Meta del modelo.
+    """
+    cursor_kwarg = 'cursor'
+    keyset_ordering = None
+    paginator_class = EstimatedCountPaginator
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.cursor_kwarg not in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = paginator.page(self.request.GET[self.cursor_kwarg])
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class BookListView(ConditionalGetMixin, PageCacheMixin,
+                   KeysetPaginationMixin, generic.ListView):
+    use_replica = True
     model = Book
     paginate_by = 2
 
+    def get_queryset(self):
+        return Book.objects.for_list()
+
+    def get_validators(self):
+        return book_list_validators()
+
+    def get_page_cache_tags(self, context):
+        authors = {f'author:{b.author_id}' for b in context['object_list']}
+        return {'books', *authors}
 
-class BookDetailView(generic.DetailView):
+
+class BookDetailView(ConditionalGetMixin, PageCacheMixin,
+                     generic.DetailView):
+    use_replica = True
     model = Book
 
+    def get_queryset(self):
+        return Book.objects.for_detail()
+
+    def get_validators(self):
+        return book_validators(self.kwargs['pk'])
+
+    def get_page_cache_tags(self, context):
+        book = self.object
+        genres = {f'genre:{g.pk}' for g in book.genre.all()}
+        return {f'book:{book.pk}', f'author:{book.author_id}',
+                f'language:{book.language_id}', *genres}
 
-class AuthorListView(generic.ListView):
+
+class AuthorListView(ConditionalGetMixin, PageCacheMixin,
+                     KeysetPaginationMixin, generic.ListView):
+    use_replica = True
     model = Author
     paginate_by = 3
 
+    def get_validators(self):
+        return author_list_validators()
+
+    def get_page_cache_tags(self, context):
+        return {'authors'}
+
 
-class AuthorDetailView(generic.DetailView):
+class AuthorDetailView(ConditionalGetMixin, PageCacheMixin,
+                       generic.DetailView):
+    use_replica = True
     model = Author
 
+    def get_queryset(self):
+        return Author.objects.for_detail()
+
+    def get_validators(self):
+        return author_validators(self.kwargs['pk'])
+
+    def get_page_cache_tags(self, context):
+        pk = self.object.pk
+        books = {f'book:{b.pk}' for b in context['book_list']}
+        return {f'author:{pk}', f'author-books:{pk}', *books}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Lista ya precargada: la reutilizan el listado y la barra lateral
+        context['book_list'] = self.object.book_set.all()
+        return context
+
+
+class BookSearchView(generic.ListView):
+    """Búsqueda de libros por título, resumen, ISBN o autor (``?q=``)."""
+    use_replica = True
+    template_name = 'catalog/book_search.html'
+    context_object_name = 'book_list'
+    paginate_by = 10
+    paginator_class = EstimatedCountPaginator
 
-class LoanedBooksByUserListView(LoginRequiredMixin, generic.ListView):
+    def get_queryset(self):
+        self.q = self.request.GET.get('q', '').strip()
+        if not self.q:
+            return Book.objects.none()
+        return search_books(self.q).defer('summary', 'search_vector')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['q'] = self.q
+        return context
+
+
+class LoanedBooksByUserListView(LoginRequiredMixin, KeysetPaginationMixin,
+                                generic.ListView):
     model = BII
     template_name = 'catalog/bookinstance_list_borrowed_user.html'
     paginate_by = 10
 
     def get_queryset(self):
         u = self.request.user
-        bii = BII.objects.filter(borrower=u)
-        return bii.filter(status__exact='o').order_by('due_back')
+        bii = BII.objects.for_loan_list().filter(borrower=u)
+        return bii.on_loan().with_overdue().order_by('due_back')
 
 
-class LoanedBooksListView(LoginRequiredMixin, generic.ListView):
+class LoanedBooksListView(LoginRequiredMixin, KeysetPaginationMixin,
+                          generic.ListView):
     model = BII
     template_name = 'catalog/bookinstance_list_all_borrowed.html'
     paginate_by = 10
 
     def get_queryset(self):
-        return BII.objects.filter(status__exact='o').order_by('due_back')
+        qs = BII.objects.for_loan_list().on_loan().with_overdue()
+        return qs.order_by('due_back')
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('bulk_form', BulkLoanForm(initial={
+            'renewal_date': dt.date.today() + dt.timedelta(weeks=3)}))
+        selected = kwargs['bulk_form']['copies'].value() or []
+        kwargs.setdefault('selected_copies', selected)
+        return super().get_context_data(**kwargs)
+
+    def post(self, request, *args, **kwargs):
+        """Renovación o devolución en bloque de las copias marcadas."""
+        if not request.user.has_perm('catalog.can_mark_returned'):
+            raise PermissionDenied
+        form = BulkLoanForm(request.POST)
+        if form.is_valid():
+            rows = form.save()
+            if rows is not None:
+                # El UPDATE no emite señales: los contadores cacheados los
+                # descarta BookInstanceQuerySet.update
+                messages.success(request, f'{rows} copies updated.')
+                return HttpResponseRedirect(reverse('all-borrowed'))
+        self.object_list = self.get_queryset()
+        context = self.get_context_data(bulk_form=form)
+        return self.render_to_response(context, status=400)
 
 
 @login_required
@@ -108,7 +238,8 @@ def renew_book_librarian(request, pk):
         'book_instance': book_instance,
     }
 
-    return render(request, 'catalog/book_renew_librarian.html', context)
+    t = 'catalog/book_renew_librarian.html'
+    return TemplateResponse(request, t, context)
 
 
 class PermissionRequiredMixin1(UserPassesTestMixin):
@@ -147,14 +278,37 @@ class StaffOrPermissionRequiredMixin(UserPassesTestMixin):
 
 class BookCreate(StaffOrPermissionRequiredMixin, CreateView):
     model = Book
-    fields = ['title', 'author', 'summary', 'isbn', 'genre', 'language']
+    form_class = BookForm
 
 
 class BookUpdate(StaffOrPermissionRequiredMixin, UpdateView):
     model = Book
-    fields = ['title', 'author', 'summary', 'isbn', 'genre', 'language']
+    form_class = BookForm
 
 
 class BookDelete(StaffOrPermissionRequiredMixin, DeleteView):
     model = Book
     success_url = reverse_lazy('books')
+
+
+EXPORT_CONTENT_TYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+
+@staff_member_required
+def export_catalog(request, dataset, fmt):
+    """
+    Descarga de libros, copias o préstamos en curso en CSV o JSONL
+    (``?gzip=1`` para comprimir), generada en streaming.
+    """
+    if dataset not in DATASETS or fmt not in FORMATS:
+        raise Http404('Unknown export')
+    gzip = request.GET.get('gzip') in ('1', 'true')
+    filename = f'{dataset}.{fmt}'
+    content_type = EXPORT_CONTENT_TYPES[fmt]
+    if gzip:
+        filename += '.gz'
+        content_type = 'application/gzip'
+    response = StreamingHttpResponse(export(dataset, fmt, gzip),
+                                     content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,54 @@
+"""
+Contador de visitas de la página de inicio.
+
+Guardar ``num_visits`` en la sesión en cada visita obliga a reescribir la
+sesión (un UPDATE con el backend de BD) en cada petición. Aquí las visitas
+se acumulan en la caché y se vuelcan a la sesión cada
+``VISITS_FLUSH_EVERY`` visitas. Si la caché pierde la entrada se pierden
+como mucho esas visitas pendientes.
+
+La entrada de la caché va con una clave propia guardada en la sesión (no
+con ``session_key``, que cambia al iniciar sesión), así que las visitas
+pendientes sobreviven al login. No hay nada que volcar al acabar la
+sesión: al expirar o al cerrarla (``logout`` la vacía) el contador se
+pierde entero, volcado o no.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _key(session):
+    return f"catalog:visits:{session['visits_key']}"
+
+
+def count_visit(session):
+    """Registra una visita y devuelve el número de visitas anteriores."""
+    stored = session.get('num_visits', 0)
+    flush_every = getattr(settings, 'VISITS_FLUSH_EVERY', 10)
+    # Sin clave todavía (primera visita) o sin lotes se guarda directamente
+    if 'visits_key' not in session or flush_every <= 1:
+        session['num_visits'] = stored + 1
+        if flush_every > 1:
+            session['visits_key'] = uuid.uuid4().hex
+        return stored
+
+    key = _key(session)
+    timeout = session.get_expiry_age()
+    if cache.add(key, 1, timeout):
+        pending = 1
+    else:
+        try:
+            pending = cache.incr(key)
+        except ValueError:  # Expirada o descartada desde el add()
+            cache.set(key, 1, timeout)
+            pending = 1
+    if pending >= flush_every:
+        session['num_visits'] = stored + pending
+        try:
+            cache.decr(key, pending)
+        except ValueError:
+            pass
+    return stored + pending - 1
@@ -0,0 +1,56 @@
+"""
+Widgets de autocompletado (Select2 de ``django.contrib.admin``) contra las
+fuentes de ``catalog/autocomplete.py``: el HTML solo lleva las opciones
+elegidas, el resto se piden al escribir.
+"""
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteMixin:
+    def __init__(self, source, attrs=None):
+        self.source = source
+        super().__init__(attrs)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs.setdefault('class', '')
+        attrs['class'] += ' catalog-autocomplete'
+        attrs['data-autocomplete-url'] = reverse('autocomplete',
+                                                 args=[self.source])
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        queryset = self.choices.queryset
+        pk = queryset.model._meta.pk
+        selected = []
+        for v in value:
+            try:
+                if v not in ('', None):
+                    selected.append(pk.to_python(v))
+            except ValidationError:
+                pass
+        options = []
+        if not self.is_required and not self.allow_multiple_selected:
+            options.append(self.create_option(name, '', '', False, 0))
+        for obj in queryset.filter(pk__in=selected):
+            options.append(self.create_option(
+                name, obj.pk, self.choices.field.label_from_instance(obj),
+                True, len(options)))
+        return [(None, options, 0)]
+
+    class Media:
+        css = {'screen': ('admin/css/vendor/select2/select2.min.css',)}
+        js = ('admin/js/vendor/jquery/jquery.min.js',
+              'admin/js/vendor/select2/select2.full.min.js',
+              'js/autocomplete.js')
+
+
+class AutocompleteSelect(AutocompleteMixin, forms.Select):
+    pass
+
+
+class AutocompleteSelectMultiple(AutocompleteMixin, forms.SelectMultiple):
+    pass
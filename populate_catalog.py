@@ -11,6 +11,8 @@ import django
 django.setup()
 
 from catalog.models import Book, BookInstance, Language, Genre, Author
+from catalog.pagecache import invalidate_tags
+from catalog.stats import invalidate_stats
 
 
 def populate():
@@ -111,49 +113,52 @@ def populate():
     ]
 
 
-    for lan in languages:
-        lang = Language(name=lan['name'])
-        lang.save()
+    # Mapas en memoria nombre -> objeto para no volver a consultar la BD
+    langs = Language.objects.bulk_create(
+        [Language(name=lan['name']) for lan in languages])
+    langs = {lang.name: lang for lang in langs}
 
-    for gen in genres:
-        genr = Genre(name=gen['name'])
-        genr.save()
+    gens = Genre.objects.bulk_create([Genre(name=gen['name']) for gen in genres])
+    gens = {genr.name: genr for genr in gens}
 
+    auths = {}
     for aut in authors:
         if not aut['date_of_death']:
             dod = None
         else:
             dod = aut['date_of_death']
         auth = Author(first_name=aut['first_name'], last_name=aut['last_name'], date_of_birth=aut['date_of_birth'], date_of_death=dod)
-        auth.save()
+        auths[(aut['first_name'], aut['last_name'])] = auth
+    Author.objects.bulk_create(auths.values())
 
+    boks = {}
     for bo in books:
-        t    = bo['title']
-        s    = bo['summary']
-        isb  = bo['isbn']
-        l    = bo['language']
-        g    = bo['genre']
-        a_fn = bo['author']['first_name']
-        a_ln = bo['author']['last_name']
-
-        aut  = Author.objects.filter(first_name__contains=a_fn, last_name__contains=a_ln).first()
-        lang = Language.objects.filter(name__contains=l).first()
-        new_book = Book(title=t, isbn=isb, summary=s, author=aut, language=lang)
-        new_book.save() # A first save is convenient to avoid Foreign Key problems with the N-M relation
-        for ge in g:
-            gen = Genre.objects.filter(name__contains=ge).first()
-            new_book.genre.add(gen)
+        aut = auths[(bo['author']['first_name'], bo['author']['last_name'])]
+        boks[bo['title']] = Book(title=bo['title'], isbn=bo['isbn'], summary=bo['summary'], author=aut, language=langs[bo['language']])
+    # Los signals de Book (índice de búsqueda, contadores) requieren save()
+    for new_book in boks.values():
         new_book.save()
 
+    through = Book.genre.through
+    links = []
+    for bo in books:
+        g = bo['genre']
+        if isinstance(g, str):
+            g = [g]
+        for ge in g:
+            links.append(through(book=boks[bo['title']], genre=gens[ge]))
+    through.objects.bulk_create(links)
+
+    instances = []
     for bi in book_instances:
-        bok  = Book.objects.filter(title__contains=bi['book']).first()
         if not bi['due_back']:
             db = None
         else:
             db = bi['due_back']
-        new_book_instance = BookInstance(book=bok, imprint=bi['imprint'], due_back=db, status=bi['status'])
-        new_book_instance.save()
-
+        instances.append(BookInstance(book=boks[bi['book']], imprint=bi['imprint'], due_back=db, status=bi['status']))
+    BookInstance.objects.bulk_create(instances)
+    invalidate_stats()
+    invalidate_tags({'books', 'authors'})
 
 if __name__ == '__main__':
     print("Starting catalog population script...")
@@ -0,0 +1,19 @@
+// Select2 sobre los <select class="catalog-autocomplete"> (catalog/widgets.py)
+'use strict';
+jQuery(function($) {
+    $('select.catalog-autocomplete').each(function() {
+        $(this).select2({
+            width: '100%',
+            allowClear: !this.required && !this.multiple,
+            placeholder: '',
+            ajax: {
+                url: this.dataset.autocompleteUrl,
+                dataType: 'json',
+                delay: 250,
+                data: function(params) {
+                    return {q: params.term, page: params.page};
+                }
+            }
+        });
+    });
+});